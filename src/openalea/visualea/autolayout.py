@@ -0,0 +1,227 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Layered layout of dataflows.
+
+Sugiyama style: the vertices are put on layers (the data flows from top to
+bottom), long edges are split by dummy vertices, the order of the vertices in
+each layer is refined by barycenter sweeps to reduce the crossings, and the
+x coordinates are pulled towards the neighbours without overlapping.
+
+This module does not depend on Qt so that it can run in a worker thread.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import numpy as np
+
+# spacing between two vertices of a layer, and between two layers
+H_GAP = 30.
+V_GAP = 50.
+# number of down and up barycenter sweeps
+SWEEPS = 4
+# number of passes pulling the vertices towards their neighbours
+PULLS = 4
+
+
+def assign_layers(n, edges):
+    """ Return the layer of each of the n vertices: the length of the longest
+    path reaching it. Cycles are broken at the vertex with the fewest
+    unresolved inputs.
+
+    :param edges: int array of shape (m, 2) of (source, target) indices.
+    """
+    src, dst = edges[:, 0], edges[:, 1]
+    order = np.argsort(src, kind="stable")
+    starts = np.searchsorted(src[order], np.arange(n + 1))
+    targets = dst[order].tolist()
+    indeg = np.bincount(dst, minlength=n).tolist()
+    layer = [0] * n
+    done = [False] * n
+    ready = [v for v in range(n) if indeg[v] == 0]
+    remaining = n
+    starts = starts.tolist()
+    while remaining:
+        if not ready:
+            # cycle: force the pending vertex with the fewest missing inputs
+            v = min((v for v in range(n) if not done[v]), key=lambda v: indeg[v])
+            ready.append(v)
+        v = ready.pop()
+        if done[v]:
+            continue
+        done[v] = True
+        remaining -= 1
+        lv = layer[v] + 1
+        for w in targets[starts[v]:starts[v + 1]]:
+            if done[w]:
+                continue
+            if layer[w] < lv:
+                layer[w] = lv
+            indeg[w] -= 1
+            if indeg[w] == 0:
+                ready.append(w)
+    return np.array(layer, dtype=np.int64)
+
+
+def split_long_edges(layer, edges):
+    """ Orient the edges downwards and split those spanning several layers.
+
+    Returns the layers of the vertices followed by the dummy vertices, and the
+    (upper, lower) edges between consecutive layers.
+    """
+    n = len(layer)
+    if not len(edges):
+        return layer, np.zeros((0, 2), dtype=np.int64)
+    up, low = edges[:, 0], edges[:, 1]
+    flip = layer[up] > layer[low]
+    up, low = np.where(flip, low, up), np.where(flip, up, low)
+    keep = layer[up] != layer[low]
+    up, low = up[keep], low[keep]
+    span = layer[low] - layer[up]
+
+    # one dummy per intermediate layer of each long edge
+    nbDummies = int((span - 1).sum())
+    chainStart = np.concatenate(([0], np.cumsum(span)))[:-1]
+    edgeOf = np.repeat(np.arange(len(span)), span)
+    step = np.arange(len(edgeOf)) - chainStart[edgeOf]
+    # chain of each edge: up, dummies..., low
+    dummyIds = n + np.arange(nbDummies)
+    isLast = step == span[edgeOf] - 1
+    # the dummy ids in chain order: the k-th intermediate node of edge e
+    upper = np.empty(len(edgeOf), dtype=np.int64)
+    lower = np.empty(len(edgeOf), dtype=np.int64)
+    inner = ~isLast
+    lower[inner] = dummyIds
+    lower[isLast] = low
+    first = step == 0
+    upper[first] = up
+    upper[~first] = lower[np.flatnonzero(~first) - 1]
+    dummyLayer = layer[up][edgeOf[inner]] + step[inner] + 1
+    return np.concatenate((layer, dummyLayer)), np.stack((upper, lower), axis=1)
+
+
+def _rank(keys):
+    """ Position of each key once they are sorted """
+    ranks = np.empty(len(keys), dtype=np.float64)
+    ranks[np.argsort(keys, kind="stable")] = np.arange(len(keys))
+    return ranks
+
+
+def order_layers(layer, links, sweeps=SWEEPS):
+    """ Return the position of each vertex in its layer, after barycenter
+    sweeps reducing the edge crossings """
+    total = len(layer)
+    nbLayers = int(layer.max()) + 1 if total else 0
+    byLayer = np.argsort(layer, kind="stable")
+    bounds = np.searchsorted(layer[byLayer], np.arange(nbLayers + 1))
+    members = [byLayer[bounds[i]:bounds[i + 1]] for i in range(nbLayers)]
+
+    pos = np.empty(total, dtype=np.float64)
+    # index of each vertex in the member array of its layer
+    local = np.empty(total, dtype=np.int64)
+    for m in members:
+        pos[m] = local[m] = np.arange(len(m))
+
+    # links grouped by the layer of their upper end
+    linkLayer = layer[links[:, 0]] if len(links) else np.zeros(0, dtype=np.int64)
+    byLink = np.argsort(linkLayer, kind="stable")
+    links = links[byLink]
+    linkBounds = np.searchsorted(linkLayer[byLink], np.arange(nbLayers + 1))
+
+    def reorder(i, fixed, moving, sl):
+        m = members[i]
+        if not len(m) or sl.start == sl.stop:
+            return
+        f, v = links[sl, fixed], local[links[sl, moving]]
+        sums = np.bincount(v, weights=pos[f], minlength=len(m))
+        counts = np.bincount(v, minlength=len(m))
+        bary = np.where(counts > 0, sums / np.maximum(counts, 1), pos[m])
+        pos[m] = _rank(bary)
+
+    for _ in range(sweeps):
+        for i in range(1, nbLayers):
+            reorder(i, 0, 1, slice(linkBounds[i - 1], linkBounds[i]))
+        for i in range(nbLayers - 2, -1, -1):
+            reorder(i, 1, 0, slice(linkBounds[i], linkBounds[i + 1]))
+    return pos, members
+
+
+def _place(desired, widths, gap):
+    """ Leftmost x of vertices in a row, as close as possible to desired
+    while keeping their order and at least gap between them """
+    offset = np.concatenate(([0.], np.cumsum(widths[:-1] + gap)))
+    x = offset + np.maximum.accumulate(desired - offset)
+    # shift the row to be centered on what was desired
+    return x + (desired - x).mean()
+
+
+def assign_coordinates(layer, links, members, pos, widths, heights,
+                       hgap=H_GAP, vgap=V_GAP, pulls=PULLS):
+    """ Return the (x, y) of the top left corner of each vertex """
+    total = len(layer)
+    rows = [m[np.argsort(pos[m], kind="stable")] for m in members]
+    rowHeights = np.array([heights[r].max() if len(r) else 0. for r in rows])
+    rowY = np.concatenate(([0.], np.cumsum(rowHeights + vgap)))[:-1]
+
+    x = np.zeros(total)
+    for r in rows:
+        x[r] = np.concatenate(([0.], np.cumsum(widths[r][:-1] + hgap)))
+    center = widths / 2.
+
+    up, low = (links[:, 0], links[:, 1]) if len(links) else (np.zeros(0, int),) * 2
+    for _ in range(pulls):
+        # mean center of the neighbours, in both directions
+        c = x + center
+        sums = np.bincount(low, weights=c[up], minlength=total) + \
+            np.bincount(up, weights=c[low], minlength=total)
+        counts = np.bincount(low, minlength=total) + np.bincount(up, minlength=total)
+        desired = np.where(counts > 0, sums / np.maximum(counts, 1), c) - center
+        for r in rows:
+            if len(r):
+                x[r] = _place(desired[r], widths[r], hgap)
+
+    xy = np.empty((total, 2))
+    xy[:, 0] = x - x.min() if total else x
+    xy[:, 1] = rowY[layer]
+    return xy
+
+
+def layered_layout(widths, heights, edges, hgap=H_GAP, vgap=V_GAP):
+    """ Lay out a graph from top to bottom.
+
+    :param widths: sizes of the n vertices.
+    :param heights: sizes of the n vertices.
+    :param edges: sequence of (source, target) vertex indices.
+    :returns: float array of shape (n, 2), top left corner of each vertex,
+              the smallest x and y being 0.
+    """
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    n = len(widths)
+    if n == 0:
+        return np.zeros((0, 2))
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    layer = assign_layers(n, edges)
+    layer, links = split_long_edges(layer, edges)
+    total = len(layer)
+    # dummies take little room
+    widths = np.concatenate((widths, np.full(total - n, 10.)))
+    heights = np.concatenate((heights, np.zeros(total - n)))
+
+    pos, members = order_layers(layer, links)
+    xy = assign_coordinates(layer, links, members, pos, widths, heights, hgap, vgap)
+    xy = xy[:n]
+    return xy - xy.min(axis=0)
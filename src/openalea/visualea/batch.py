@@ -0,0 +1,179 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Headless evaluation of package factories (``visualea-run``).
+
+Examples::
+
+    visualea-run mypkg:mydataflow -i x=3 -i name=foo
+    visualea-run mypkg:mydataflow --inputs sets.csv --jobs 8 > results.jsonl
+
+Each set of inputs gives one JSON line on stdout with the outputs of the
+node. Anything printed by the packages goes to stderr. This module must not
+import Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+from ast import literal_eval
+from concurrent import futures
+
+
+def parse_value(text):
+    """ Return the python literal written in text, or text itself """
+    try:
+        return literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_assignment(text):
+    """ Parse "name=value" """
+    name, sep, value = text.partition("=")
+    if not sep or not name.strip():
+        raise ValueError("Invalid input %r, expected name=value" % text)
+    return name.strip(), parse_value(value)
+
+
+def read_input_sets(filename):
+    """ Return the list of input sets (dicts) stored in a JSON or CSV file.
+
+    A JSON file holds one object or a list of objects. Each row of a CSV
+    file is an input set, the header giving the input names.
+    """
+    with open(filename, newline="") as f:
+        if os.path.splitext(filename)[1].lower() == ".csv":
+            return [dict((k, parse_value(v)) for k, v in row.items())
+                    for row in csv.DictReader(f)]
+        data = json.load(f)
+    if isinstance(data, dict):
+        return [data]
+    if isinstance(data, list) and all(isinstance(d, dict) for d in data):
+        return data
+    raise ValueError("%s must contain an object or a list of objects" % filename)
+
+
+def split_factory_name(spec):
+    """ Split "package:name" """
+    pkg_id, sep, name = spec.rpartition(":")
+    if not sep or not pkg_id or not name:
+        raise ValueError("Invalid factory %r, expected package:name" % spec)
+    return pkg_id, name
+
+
+##############
+# Evaluation #
+##############
+_factories = {}
+
+
+def load_factory(spec):
+    """ Return the factory named "package:name", loading the packages once
+    per process """
+    if spec not in _factories:
+        from openalea.core.pkgmanager import PackageManager
+        from openalea.visualea import evaluators  # registers the parallel evaluators
+
+        pkg_id, name = split_factory_name(spec)
+        with contextlib.redirect_stdout(sys.stderr):
+            pm = PackageManager()
+            pm.init(verbose=False)
+            _factories[spec] = pm[pkg_id][name]
+    return _factories[spec]
+
+
+def run_factory(spec, inputs, evaluator=None):
+    """ Evaluate a new instance of the factory with inputs.
+    Return the map output name -> value """
+    node = load_factory(spec).instantiate()
+    if evaluator is not None:
+        node.eval_algo = evaluator
+    with contextlib.redirect_stdout(sys.stderr):
+        for key, value in inputs.items():
+            node.set_input(key, value)
+        node.eval()
+    return dict((port["name"], node.get_output(i))
+                for i, port in enumerate(node.output_desc))
+
+
+def _run_job(spec, index, inputs, evaluator):
+    """ Return (failed, JSON record) for one input set """
+    record = {"index": index, "inputs": inputs}
+    try:
+        record["outputs"] = run_factory(spec, inputs, evaluator)
+    except Exception as e:
+        record["error"] = "%s: %s" % (type(e).__name__, e)
+    return "error" in record, json.dumps(record, default=repr)
+
+
+def run_batch(spec, input_sets, jobs=1, evaluator=None, out=None):
+    """ Evaluate spec for each input set and write one JSON line per set to
+    out, as soon as it is available. Return the number of failed sets. """
+    out = out or sys.stdout
+    failures = 0
+
+    def emit(result):
+        failed, line = result
+        out.write(line + "\n")
+        out.flush()
+        return failed
+
+    if jobs <= 1 or len(input_sets) <= 1:
+        for index, inputs in enumerate(input_sets):
+            failures += emit(_run_job(spec, index, inputs, evaluator))
+        return failures
+
+    with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = [pool.submit(_run_job, spec, index, inputs, evaluator)
+                   for index, inputs in enumerate(input_sets)]
+        for future in futures.as_completed(pending):
+            failures += emit(future.result())
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="visualea-run",
+                                     description="Evaluate an OpenAlea node without the GUI.")
+    parser.add_argument("factory", help="node to evaluate, as package:name")
+    parser.add_argument("-i", "--input", action="append", default=[], metavar="NAME=VALUE",
+                        help="set an input (values are python literals or strings)")
+    parser.add_argument("--inputs", metavar="FILE",
+                        help="JSON or CSV file of input sets, one evaluation per set")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of processes used to evaluate the input sets")
+    parser.add_argument("--evaluator", help="evaluation algorithm of composite nodes")
+    args = parser.parse_args(argv)
+
+    try:
+        split_factory_name(args.factory)
+        common = dict(parse_assignment(a) for a in args.input)
+        if args.inputs:
+            input_sets = [dict(common, **s) for s in read_input_sets(args.inputs)]
+        else:
+            input_sets = [common]
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    failures = run_batch(args.factory, input_sets, args.jobs, args.evaluator)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,7 +25,7 @@ __revision__ = " $Id$"
 from qtpy import QtWidgets, QtGui, QtCore
 import os
 from subprocess import Popen
-from openalea.core.settings import Settings
+from openalea.visualea.uisettings import get_ui_settings
 from openalea.visualea.util import open_dialog
 from openalea.core.path import path
 
@@ -34,15 +34,8 @@ def get_editor():
     """ Return the editor class """
     
     editor = PythonCodeEditor
-
-    s = Settings()
-    try:
-        str = s.get('editor', 'use_external')
-        l = eval(str)
-        if(l): editor = ExternalCodeEditor
-        
-    except:
-        pass
+    if get_ui_settings().use_external_editor:
+        editor = ExternalCodeEditor
 
     return editor
 
@@ -87,14 +80,8 @@ class ExternalCodeEditor(AbstractCodeEditor):
 
     def get_command(self):
         """ Return command to execute """
-        s = Settings()
-        cmd = ""
-        try:
-            cmd = s.get('editor', 'command')
-            
-        except:
-            cmd = ""
-            
+        cmd = get_ui_settings().editor_command
+
         if(not cmd):
             if('posix' in os.name):
                 return "/usr/bin/vim"
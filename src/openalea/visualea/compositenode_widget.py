@@ -28,7 +28,7 @@ from qtpy import QtGui, QtWidgets
 from openalea.visualea.graph_operator import GraphOperator
 from openalea.visualea.dataflowview import GraphicalGraph
 from openalea.visualea.node_widget import NodeWidget
-from openalea.visualea.util import busy_cursor, exception_display
+from openalea.visualea.evaluation import get_evaluation_engine
 from openalea.visualea.node_widget import DefaultNodeWidget
 from openalea.visualea.tooltip import VertexTooltip
 
@@ -155,10 +155,8 @@ class DisplayGraphWidget(NodeWidget, QtWidgets.QWidget):
         self.vboxlayout.addLayout(buttons)
 
 
-    @exception_display
-    @busy_cursor
     def run_node(self):
-        self.node.eval_as_expression(self.sender().id)
+        get_evaluation_engine().run(self.node, self.sender().id)
 
 
     def open_widget(self):
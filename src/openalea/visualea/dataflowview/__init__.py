@@ -22,15 +22,22 @@ from . import vertex
 from . import edge
 from . import anno
 from . import adapter
-
-from qtpy.QtWidgets import QMessageBox, QGraphicsView
-from qtpy.QtCore import QDataStream, QIODevice, Qt
+from . import timing
+from . import positions
+from . import export
+from . import paintcache
+
+import weakref
+from contextlib import contextmanager
+from qtpy.QtWidgets import QMessageBox, QGraphicsView, QGraphicsScene
+from qtpy.QtCore import QDataStream, QEvent, QIODevice, Qt, QTimer
 from openalea.visualea.graph_operator import GraphOperator
+from openalea.visualea.evaluation import get_evaluation_engine
 from openalea.core import compositenode, node
 from openalea.core.pkgmanager import PackageManager  # for drag and drop
 from openalea.core.node import RecursionError
 from openalea.core.algo import dataflow_evaluation as evalmodule
-from openalea.grapheditor import qt
+from openalea.grapheditor import qt, qtgraphview
 #from openalea.grapheditor import baselisteners, qtgraphview, qtutils
 from openalea.core.node import NodeFactory
 from openalea.core.compositenode import CompositeNodeFactory
@@ -39,6 +46,9 @@ import openalea.grapheditor.base
 
 class DataflowView(qt.View):
 
+    # ms, the pointer must rest this long before the hovered annotation is looked for
+    hoverDelay = 40
+
     def __init__(self, parent, *args, **kwargs):
         qt.View.__init__(self, parent)
 
@@ -62,6 +72,14 @@ class DataflowView(qt.View):
         if not self.__noToolBar:
             self.__annoToolBar = anno.AnnotationTextToolbar(None)
             self.__annoToolBar.setSleepOnDisappear(True)
+            # the annotation under the pointer is looked for once the pointer
+            # settles, or leaves the annotation it was over.
+            self.__hoverPos = None
+            self.__hoverAnnotation = None
+            self.__hoverTimer = QTimer(self)
+            self.__hoverTimer.setSingleShot(True)
+            self.__hoverTimer.setInterval(self.hoverDelay)
+            self.__hoverTimer.timeout.connect(self.__update_hovered_annotation)
 
         self.copyRequest.connect(self.on_copy_request)
         self.cutRequest.connect(self.on_cut_request)
@@ -75,6 +93,18 @@ class DataflowView(qt.View):
             scene.addItem(self.__annoToolBar)
         qt.View.setScene(self, scene)
 
+    def changeEvent(self, event):
+        qt.View.changeEvent(self, event)
+        if event.type() in (QEvent.PaletteChange, QEvent.StyleChange):
+            # the shared brushes were built for the previous theme
+            scene = self.scene()
+            if scene is None:
+                return
+            paintcache.invalidate_paint_resources(scene)
+            for item in scene.get_items(filterType=qtgraphview.Vertex):
+                item.update_colors()
+            scene.update()
+
     def set_clipboard(self, cnf):
         self.__clipboard = cnf
 
@@ -298,23 +328,38 @@ class DataflowView(qt.View):
     # Handling mouse events #
     #########################
     def mouseMoveEvent(self, e):
-        if not self.__noToolBar:
-            # -- the annotation toolbar (color of the text/postit) is positionned
-            # here. When the pointer is over an annotation, the annotation is set
-            # as the annotation of the annotation toolbar. This correctly puts the
-            # toolbar in the right place and reveals it.
-            # If the pointer not over an annotation it is hidden unless it is over
-            # the toolbar. --
-            items = self.items(e.pos())
-            annotations = [i for i in items if isinstance(i, anno.GraphicalAnnotation)]
-            if len(annotations) > 0:
-                firstAnno = annotations[0]
-                self.__annoToolBar.wakeup()
-                self.__annoToolBar.set_annotation(firstAnno, self)
-            # elif not self.__annoToolBar in items :
-            #     self.__annoToolBar.set_annotation(None)
-
-        qt.View.mouseMoveEvent(self, e)
+        scene = self.scene()
+        if not self.__noToolBar and anno.has_annotations(scene):
+            # the rect is read again: the annotation may have been moved or resized
+            hovered = self.__hoverAnnotation() if self.__hoverAnnotation is not None else None
+            if (hovered is None or hovered.scene() is not scene or
+                    not hovered.sceneBoundingRect().contains(self.mapToScene(e.pos()))):
+                self.__hoverAnnotation = None
+                self.__hoverPos = e.pos()
+                self.__hoverTimer.start()
+
+        if scene is None or not e.buttons() & Qt.LeftButton:
+            qt.View.mouseMoveEvent(self, e)
+            return
+        # dragging a selection: the edges are updated once per frame
+        with positions.batch_positions(scene):
+            qt.View.mouseMoveEvent(self, e)
+
+    def __update_hovered_annotation(self):
+        # -- the annotation toolbar (color of the text/postit) is positionned
+        # here. When the pointer is over an annotation, the annotation is set
+        # as the annotation of the annotation toolbar. This correctly puts the
+        # toolbar in the right place and reveals it.
+        # If the pointer not over an annotation it is hidden unless it is over
+        # the toolbar. --
+        scene = self.scene()
+        if scene is None or self.__hoverPos is None:
+            return
+        annotation = anno.annotation_at(scene, self.mapToScene(self.__hoverPos))
+        if annotation is not None:
+            self.__hoverAnnotation = weakref.ref(annotation)
+            self.__annoToolBar.wakeup()
+            self.__annoToolBar.set_annotation(annotation, self)
 
     ###########################################
     # Handling context menu on the graph view #
@@ -332,6 +377,18 @@ class DataflowView(qt.View):
         menu.addAction(operator("Add Annotation", menu,
                                 "graph_add_annotation", position=scenePos))
 
+        stopAction = operator("Stop evaluation", menu, "graph_stop")
+        stopAction.setEnabled(get_evaluation_engine().is_running(self.scene().get_graph()))
+        menu.addAction(stopAction)
+
+        # -- Execution timings --
+        timingAction = operator("Show execution timings", menu, "graph_show_timings")
+        timingAction.setCheckable(True)
+        timingAction.setChecked(timing.overlay_enabled(self.scene()))
+        menu.addAction(timingAction)
+        menu.addAction(operator("Slowest nodes...", menu, "graph_show_slowest_nodes"))
+        menu.addAction(operator("Clear result cache", menu, "graph_clear_result_cache"))
+
         # -- Evaluator submenu --
         evaluatorSubmenu = menu.addMenu("Evaluator")
         classlist = sorted(evalmodule.__evaluators__)
@@ -343,12 +400,33 @@ class DataflowView(qt.View):
             if c == self.scene().get_graph().eval_algo:
                 evaluatorSubmenu.setActiveAction(action)
                 action.setChecked(True)
+        evaluatorSubmenu.addSeparator()
+        evaluatorSubmenu.addAction(operator("Evaluation threads...", evaluatorSubmenu,
+                                            "graph_set_thread_limit"))
 
         menu.move(event.globalPos())
         menu.show()
         event.accept()
 
 
+@contextmanager
+def bulk_load(scene):
+    """ Suspend the scene index and the updates of its views while many items
+    are added. The BSP index is built once, at the end. """
+    views = scene.views()
+    indexMethod = scene.itemIndexMethod()
+    scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+    for view in views:
+        view.setUpdatesEnabled(False)
+    try:
+        yield scene
+    finally:
+        scene.setItemIndexMethod(indexMethod)
+        for view in views:
+            view.setUpdatesEnabled(True)
+            view.viewport().update()
+
+
 def initialise_graph_view_from_model(graphView, graphModel):
 
     # -- do the base node class initialisation --
@@ -369,6 +447,11 @@ def initialise_graph_view_from_model(graphView, graphModel):
     graphView.notify(graphModel, ("internal_data_changed",))
 
     # -- then the composite node class initialisation --
+    with bulk_load(graphView):
+        _add_vertices_and_edges(graphView, graphModel)
+
+
+def _add_vertices_and_edges(graphView, graphModel):
     ids = graphModel.vertices()
     for eltid in ids:
         vtype = "vertex"
@@ -18,7 +18,9 @@ from builtins import str
 __license__ = "Cecill-C"
 __revision__ = " $Id$ "
 
-from qtpy import QtGui, QtCore
+import weakref
+
+from qtpy import QtGui, QtCore, QtWidgets
 from openalea.grapheditor import qtgraphview, baselisteners
 from openalea.grapheditor import qtutils
 from openalea.grapheditor.qtutils import *
@@ -57,6 +59,32 @@ class AnnotationTextToolbar(AleaQGraphicsToolbar):
             self.disappear()
 
 
+##############################
+# Annotations of each scene  #
+##############################
+# scene -> annotations it contains, for hover detection without hit testing
+# every item under the pointer.
+_annotations = weakref.WeakKeyDictionary()
+
+
+def has_annotations(scene):
+    return scene is not None and bool(_annotations.get(scene))
+
+
+def annotation_at(scene, point):
+    """ Return the topmost annotation of scene whose rect contains the scene
+    point, or None """
+    found = [annotation for annotation in _annotations.get(scene, ())
+             if annotation.isVisible() and annotation.sceneBoundingRect().contains(point)]
+    if len(found) < 2:
+        return found[0] if found else None
+    # overlapping annotations: the scene knows their stacking order
+    for item in scene.items(point):
+        if item in found:
+            return item
+    return max(found, key=lambda annotation: annotation.zValue())
+
+
 ##################
 # The Annotation #
 ##################
@@ -123,8 +151,18 @@ class GraphicalAnnotation(qtgraphview.Vertex, qtutils.MemoRects):
     #####################
     # ----Qt World----  #
     #####################
-    itemChange = mixin_method(qtgraphview.Vertex, qtutils.MemoRects,
-                              "itemChange")
+    _base_itemChange = mixin_method(qtgraphview.Vertex, qtutils.MemoRects,
+                                    "itemChange")
+
+    def itemChange(self, change, value):
+        if change == QtWidgets.QGraphicsItem.ItemSceneChange:
+            if self.scene() is not None:
+                _annotations.get(self.scene(), set()).discard(self)
+        elif change == QtWidgets.QGraphicsItem.ItemSceneHasChanged:
+            scene = self.scene()
+            if scene is not None:
+                _annotations.setdefault(scene, weakref.WeakSet()).add(self)
+        return self._base_itemChange(change, value)
 
     def __onTextModified(self, rect):
         self.setHeaderRect(rect)
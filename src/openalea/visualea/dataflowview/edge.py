@@ -17,9 +17,11 @@
 __license__ = "Cecill-C"
 __revision__ = " $Id$ "
 
+from qtpy.QtCore import QPointF
 from qtpy.QtGui import QTransform
-from qtpy.QtWidgets import QGraphicsPathItem
+from qtpy.QtWidgets import QGraphicsPathItem, QGraphicsItem
 from openalea.grapheditor import qtgraphview, edgefactory, qtutils
+from openalea.visualea.dataflowview import portindex, positions
 
 class FloatingEdge(qtgraphview.FloatingEdge, QGraphicsPathItem):
     """
@@ -29,15 +31,60 @@ class FloatingEdge(qtgraphview.FloatingEdge, QGraphicsPathItem):
     interaction
     """
 
+    # radius around the cursor in which target ports are looked for
+    boxsize = 10.0
+
     def __init__(self, srcPoint, graph):
         QGraphicsPathItem.__init__(self, None)
         qtgraphview.FloatingEdge.__init__(self, srcPoint, graph)
+        self.__srcPortItem = None
+        self.__candidate = None
+
+    def source_port_item(self):
+        if self.__srcPortItem is None and self.scene() is not None:
+            self.__srcPortItem = self.scene().itemAt(self.srcPoint, QTransform())
+        return self.__srcPortItem
+
+    def closest_target(self, point):
+        """ Return the closest port around point that the dragged edge
+        can be plugged in, using the connector index of the scene """
+        scene = self.scene()
+        srcPortItem = self.source_port_item()
+        if scene is None or not hasattr(srcPortItem, "port"):
+            return None
+        srcPort = srcPortItem.port()
+        srcIsOutput = scene.is_output(srcPort)
+
+        def compatible(item):
+            if not hasattr(item, "port"):
+                return False
+            port = item.port()
+            if port.vertex() == srcPort.vertex():
+                return False
+            return scene.is_input(port) if srcIsOutput else scene.is_output(port)
+        return portindex.closest_connector(scene, point, self.boxsize, compatible)
+
+    def __set_candidate(self, item):
+        if item is self.__candidate:
+            return
+        for it, highlighted in ((self.__candidate, False), (item, True)):
+            if it is not None and hasattr(it, "set_highlighted"):
+                it.set_highlighted(highlighted)
+        self.__candidate = item
+
+    def update_line_destination(self, *pos):
+        qtgraphview.FloatingEdge.update_line_destination(self, *pos)
+        self.__set_candidate(self.closest_target(self.dstPoint))
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSceneHasChanged and self.scene() is None:
+            self.__set_candidate(None)
+        return QGraphicsPathItem.itemChange(self, change, value)
 
     def get_connections(self):
-        boxsize = 10.0
         #find the port items that were activated
-        srcPortItem = self.scene().itemAt( self.srcPoint, QTransform() )
-        dstPortItem = self.scene().find_closest_connectable(self.dstPoint, boxsize)
+        srcPortItem = self.source_port_item()
+        dstPortItem = self.closest_target(self.dstPoint)
         if not dstPortItem: return None, None
 
         #find the vertex items that were activated
@@ -75,7 +122,23 @@ class GraphicalEdge(QGraphicsPathItem, qtgraphview.Edge):
         QGraphicsPathItem.__init__(self, parent)
         qtgraphview.Edge.__init__(self, edgeModel, graphadapter, port1, port2)
         self.__edge_creator = self.set_edge_creator(edgefactory.SplineEdgePath())        
-        
+
+    # -- during a batch of moves the path is rebuilt once, by update_path --
+    def update_line_source(self, *pos):
+        if positions.defer_edge_update(self):
+            self.srcPoint = QPointF(*pos)
+        else:
+            qtgraphview.Edge.update_line_source(self, *pos)
+
+    def update_line_destination(self, *pos):
+        if positions.defer_edge_update(self):
+            self.dstPoint = QPointF(*pos)
+        else:
+            qtgraphview.Edge.update_line_destination(self, *pos)
+
+    def update_path(self):
+        qtgraphview.Edge.update_line_source(self, self.srcPoint.x(), self.srcPoint.y())
+
     def remove(self):
         self.scene().get_adapter().remove_edge( (self.srcBBox().vertex(), self.srcBBox()),
                                                 (self.dstBBox().vertex(), self.dstBBox()) )
@@ -0,0 +1,112 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Tiled PNG export of dataflow scenes.
+
+The scene is rendered in horizontal bands of fixed size tiles, and each band
+is handed to a streaming :class:`~openalea.visualea.pngwriter.PngWriter`.
+The memory used does not depend on the size of the image but on the width
+of the bands, which is bounded by ``memoryBudget``.
+
+Scene items are not thread safe, so the tiles are rendered in the GUI thread;
+the compression of the bands runs in a thread pool.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import math
+import os
+
+from qtpy import QtCore, QtGui
+
+from openalea.visualea.dataflowview.vertex import flush_geometry
+from openalea.visualea.pngwriter import CHANNELS, PngWriter
+
+# resolution at scale 1
+SCREEN_DPI = 96.
+TILE_SIZE = 512
+MEMORY_BUDGET = 128 * 2 ** 20
+
+
+def png_filename(filename):
+    """ filename with the .png suffix, which is added if it is missing """
+    if not filename.lower().endswith(".png"):
+        filename += ".png"
+    return filename
+
+
+def _image_bytes(image):
+    bits = image.constBits()
+    size = image.sizeInBytes() if hasattr(image, "sizeInBytes") else image.byteCount()
+    if hasattr(bits, "setsize"):  # PyQt voidptr
+        bits.setsize(size)
+    return bytes(bits)
+
+
+def export_png(scene, filename, source=None, scale=1., margin=10,
+               tileSize=TILE_SIZE, memoryBudget=MEMORY_BUDGET, workers=None):
+    """ Render source (the items bounding rect of scene by default) to a PNG
+    file, scale pixels per scene unit. The resolution stored in the file is
+    SCREEN_DPI * scale.
+
+    :param workers: compression threads, by default one per CPU.
+    :returns: the size of the image.
+    """
+    flush_geometry(scene)
+    if source is None:
+        source = scene.itemsBoundingRect()
+    source = QtCore.QRectF(source).adjusted(-margin, -margin, margin, margin)
+    width = max(1, int(math.ceil(source.width() * scale)))
+    height = max(1, int(math.ceil(source.height() * scale)))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # a band of tiles, and the bands being compressed, fit in the budget
+    rowBytes = width * CHANNELS
+    bandHeight = max(1, min(tileSize, memoryBudget // (rowBytes * (workers + 2))))
+
+    scene.update()
+    try:
+        with open(filename, "wb") as f:
+            with PngWriter(f, width, height, dpi=SCREEN_DPI * scale, workers=workers) as writer:
+                _render_bands(scene, writer, source, scale, tileSize, bandHeight)
+    except BaseException:
+        # no truncated image is left behind
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+    return width, height
+
+
+def _render_bands(scene, writer, source, scale, tileSize, bandHeight):
+    width, height = writer.width, writer.height
+    for top in range(0, height, bandHeight):
+        bh = min(bandHeight, height - top)
+        tiles = []
+        for left in range(0, width, tileSize):
+            tw = min(tileSize, width - left)
+            image = QtGui.QImage(tw, bh, QtGui.QImage.Format_RGB888)
+            image.fill(QtCore.Qt.white)
+            painter = QtGui.QPainter(image)
+            painter.setRenderHint(QtGui.QPainter.Antialiasing)
+            tileSource = QtCore.QRectF(source.left() + left / scale,
+                                       source.top() + top / scale,
+                                       tw / scale, bh / scale)
+            scene.render(painter, QtCore.QRectF(0, 0, tw, bh), tileSource,
+                         QtCore.Qt.IgnoreAspectRatio)
+            painter.end()
+            tiles.append((_image_bytes(image), image.bytesPerLine(), tw * CHANNELS))
+        writer.write_band(b"".join(data[y * bpl:y * bpl + size]
+                                   for data, bpl, size in tiles)
+                          for y in range(bh))
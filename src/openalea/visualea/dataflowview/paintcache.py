@@ -0,0 +1,115 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Brushes and pens shared by the items of a dataflow scene.
+
+Ports and vertices used to build their gradients on each repaint or color
+update. They now get them from the :class:`PaintResources` of their scene,
+which creates each distinct brush once.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import weakref
+
+from qtpy import QtCore, QtGui
+
+
+class PaintResources(object):
+    """ Brushes keyed by the colors and geometry they are built from """
+
+    # user colors create new entries: start over past this size.
+    maxEntries = 512
+
+    portGradientWidth = 10
+
+    # False to build the brushes on each use, see test/benchmark/bench_paint.py
+    enabled = True
+
+    def __init__(self):
+        self.__brushes = {}
+        self.allocations = 0
+        self.outlinePen = QtGui.QPen(QtCore.Qt.black, 0)
+
+    def clear(self):
+        self.__brushes.clear()
+
+    def __get(self, key, build):
+        if not self.enabled:
+            self.allocations += 1
+            return build()
+        brush = self.__brushes.get(key)
+        if brush is None:
+            if len(self.__brushes) >= self.maxEntries:
+                self.__brushes.clear()
+            brush = self.__brushes[key] = build()
+            self.allocations += 1
+        return brush
+
+    def port_brush(self, interfaceColor, highlighted):
+        """ Brush of a port whose interface has interfaceColor (or None) """
+        key = ("port", interfaceColor.rgba() if interfaceColor is not None else None,
+               bool(highlighted))
+        return self.__get(key, lambda: self.__port_brush(interfaceColor, highlighted))
+
+    def __port_brush(self, interfaceColor, highlighted):
+        gradient = QtGui.QLinearGradient(0, 0, self.portGradientWidth, 0)
+        if highlighted:
+            gradient.setColorAt(1, QtGui.QColor(QtCore.Qt.red).lighter(120))
+            gradient.setColorAt(0, QtGui.QColor(QtCore.Qt.darkRed).lighter(120))
+        elif interfaceColor is None:
+            gradient.setColorAt(0.8, QtGui.QColor(QtCore.Qt.yellow).lighter(120))
+            gradient.setColorAt(0.2, QtGui.QColor(QtCore.Qt.darkYellow).lighter(120))
+        else:
+            gradient.setColorAt(0.8, interfaceColor.lighter(120))
+            gradient.setColorAt(0.2, interfaceColor.lighter(120))
+        return QtGui.QBrush(gradient)
+
+    def vertex_brush(self, rect, topColor, bottomColor, startPos=0., endPos=1.):
+        """ Vertical gradient of a vertex body, from topColor at startPos to
+        bottomColor at endPos """
+        key = ("vertex", rect.top(), rect.height(), topColor.rgba(), bottomColor.rgba(),
+               startPos, endPos)
+
+        def build():
+            gradient = QtGui.QLinearGradient(rect.topLeft(), rect.bottomLeft())
+            gradient.setColorAt(startPos, topColor)
+            gradient.setColorAt(endPos, bottomColor)
+            return QtGui.QBrush(gradient)
+        return self.__get(key, build)
+
+
+_resources = weakref.WeakKeyDictionary()
+# used by items that are not in a scene yet.
+_orphans = PaintResources()
+
+
+def get_paint_resources(scene):
+    """ Return the paint resources of scene (created on first use) """
+    if scene is None:
+        return _orphans
+    resources = _resources.get(scene)
+    if resources is None:
+        resources = _resources[scene] = PaintResources()
+    return resources
+
+
+def invalidate_paint_resources(scene=None):
+    """ Drop the brushes of scene, or of all scenes, when the theme changes """
+    if scene is None:
+        _orphans.clear()
+    scenes = [scene] if scene is not None else list(_resources.keys())
+    for s in scenes:
+        if s in _resources:
+            _resources[s].clear()
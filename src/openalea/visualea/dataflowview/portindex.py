@@ -0,0 +1,116 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Spatial index of the connectors of a dataflow scene.
+
+The ports report their scene position to the index of their scene whenever
+they move, are shown, hidden, added or removed. While an edge is dragged,
+the closest compatible port is found by looking at a few grid cells instead
+of querying the generic scene items.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import math
+import weakref
+
+
+class GridIndex(object):
+    """ Buckets of points on a regular grid """
+
+    def __init__(self, cellSize=32.):
+        self.cellSize = float(cellSize)
+        self.__cells = {}
+        self.__where = {}
+
+    def __len__(self):
+        return len(self.__where)
+
+    def __contains__(self, key):
+        return key in self.__where
+
+    def __cell(self, x, y):
+        return int(math.floor(x / self.cellSize)), int(math.floor(y / self.cellSize))
+
+    def insert(self, key, x, y):
+        """ Insert key at (x, y), moving it if it is already indexed """
+        cell = self.__cell(x, y)
+        old = self.__where.get(key)
+        if old is not None:
+            if old[0] == cell:
+                self.__cells[cell][key] = (x, y)
+                self.__where[key] = (cell, x, y)
+                return
+            self.remove(key)
+        self.__cells.setdefault(cell, {})[key] = (x, y)
+        self.__where[key] = (cell, x, y)
+
+    def remove(self, key):
+        old = self.__where.pop(key, None)
+        if old is None:
+            return
+        bucket = self.__cells[old[0]]
+        del bucket[key]
+        if not bucket:
+            del self.__cells[old[0]]
+
+    def nearest(self, x, y, radius, accept=None):
+        """ Return the key closest to (x, y) within radius for which accept(key)
+        is True, or None """
+        (cx0, cy0), (cx1, cy1) = self.__cell(x - radius, y - radius), \
+            self.__cell(x + radius, y + radius)
+        best, bestDist = None, radius * radius
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for key, (kx, ky) in self.__cells.get((cx, cy), {}).items():
+                    dist = (kx - x) ** 2 + (ky - y) ** 2
+                    if dist <= bestDist and (accept is None or accept(key)):
+                        best, bestDist = key, dist
+        return best
+
+
+##########################
+# Per scene port indexes #
+##########################
+_indexes = weakref.WeakKeyDictionary()
+# connector -> index it is registered in
+_registered = weakref.WeakKeyDictionary()
+
+
+def get_connector_index(scene):
+    index = _indexes.get(scene)
+    if index is None:
+        index = _indexes[scene] = GridIndex()
+    return index
+
+
+def update_connector(connector):
+    """ Register the current scene position of connector, or unregister it
+    if it is hidden or not in a scene anymore """
+    old = _registered.pop(connector, None)
+    scene = connector.scene()
+    if scene is None or not connector.isVisible():
+        if old is not None:
+            old.remove(connector)
+        return
+    index = get_connector_index(scene)
+    if old is not None and old is not index:
+        old.remove(connector)
+    center = connector.sceneBoundingRect().center()
+    index.insert(connector, center.x(), center.y())
+    _registered[connector] = index
+
+
+def closest_connector(scene, point, radius, accept=None):
+    return get_connector_index(scene).nearest(point.x(), point.y(), radius, accept)
@@ -0,0 +1,89 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Batches of vertex moves.
+
+Each moved vertex notifies its ports, which update the path of every
+attached edge, once per end of the edge. While a batch is open on a scene
+the edges only record their new end points; their paths are rebuilt once
+when the outermost batch closes.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import weakref
+from contextlib import contextmanager
+
+
+class PositionBatch(object):
+    """ Edges of a scene waiting for their path to be rebuilt """
+
+    def __init__(self):
+        self.depth = 0
+        self.__edges = weakref.WeakKeyDictionary()
+
+    def defer(self, edge):
+        self.__edges[edge] = True
+
+    def flush(self):
+        edges = list(self.__edges.keys())
+        self.__edges.clear()
+        for edge in edges:
+            if edge.scene() is not None:
+                edge.update_path()
+        return len(edges)
+
+
+_batches = weakref.WeakKeyDictionary()
+
+
+@contextmanager
+def batch_positions(scene):
+    """ Defer the edge updates of scene until the end of the block. Blocks can
+    be nested, the edges are updated when the outermost one ends. """
+    batch = _batches.get(scene)
+    if batch is None:
+        batch = _batches[scene] = PositionBatch()
+    batch.depth += 1
+    try:
+        yield batch
+    finally:
+        batch.depth -= 1
+        if batch.depth == 0:
+            # the ports are in place before the edges are rebuilt
+            from openalea.visualea.dataflowview.vertex import flush_geometry
+            flush_geometry(scene)
+            batch.flush()
+
+
+def defer_edge_update(edge):
+    """ Return True if the path of edge will be rebuilt at the end of the
+    current batch of its scene, False if it must be rebuilt now """
+    scene = edge.scene()
+    batch = _batches.get(scene) if scene is not None else None
+    if batch is None or batch.depth == 0:
+        return False
+    batch.defer(edge)
+    return True
+
+
+def move_items(scene, moves):
+    """ Store the positions of many items at once.
+
+    :param moves: iterable of (item, [x, y]) pairs.
+    """
+    with batch_positions(scene):
+        for item, position in moves:
+            item.store_view_data(position=position)
+    scene.notify(None, ("graph_modified",))
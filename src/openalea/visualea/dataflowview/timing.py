@@ -0,0 +1,217 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Execution timings of the vertices of a dataflow.
+
+Each graphical vertex owns an :class:`EvalTimer` fed by the start_eval and
+stop_eval notifications of its node. When the timing overlay is enabled on a
+scene, vertices display their last/mean durations and are coloured from
+green (fast) to red (the slowest vertex of the scene).
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import time
+import weakref
+
+from qtpy import QtCore, QtGui, QtWidgets
+
+
+class EvalTimer(object):
+    """ Accumulates the evaluation durations of one vertex """
+
+    __slots__ = ("started", "last", "total", "count")
+
+    def __init__(self):
+        self.started = None
+        self.last = None
+        self.total = 0.
+        self.count = 0
+
+    def record(self, kind):
+        """ kind is "start_eval" or "stop_eval" """
+        now = time.perf_counter()
+        if kind == "start_eval":
+            self.started = now
+        elif self.started is not None:
+            self.last = now - self.started
+            self.total += self.last
+            self.count += 1
+            self.started = None
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        self.__init__()
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1.:
+        return "%.0f ms" % (seconds * 1000.)
+    if seconds < 60.:
+        return "%.2f s" % seconds
+    return "%d min %02d s" % divmod(int(seconds), 60)
+
+
+def heat_color(ratio):
+    """ Return a color from green (ratio=0) to red (ratio=1) """
+    ratio = min(max(ratio, 0.), 1.)
+    return QtGui.QColor.fromHsvF((1. - ratio) / 3., 0.75, 1.)
+
+
+###########################
+# Per scene overlay state #
+###########################
+_overlay_scenes = weakref.WeakSet()
+_slowest = weakref.WeakKeyDictionary()
+
+
+def overlay_enabled(scene):
+    return scene is not None and scene in _overlay_scenes
+
+
+def scene_slowest_duration(scene):
+    """ Longest last duration of the vertices of scene """
+    return _slowest.get(scene, 0.)
+
+
+def timed_vertices(scene):
+    from openalea.visualea.dataflowview.vertex import ObserverOnlyGraphicalVertex
+    return scene.get_items(filterType=ObserverOnlyGraphicalVertex)
+
+
+def update_slowest_duration(scene, duration):
+    """ Register a new duration. Return True if it is the new maximum, in which
+    case all the vertices of the scene must update their heat color. """
+    if scene is None or duration is None:
+        return False
+    if duration > _slowest.get(scene, 0.):
+        _slowest[scene] = duration
+        return True
+    return False
+
+
+def set_overlay_enabled(scene, enabled):
+    if enabled:
+        _overlay_scenes.add(scene)
+    else:
+        _overlay_scenes.discard(scene)
+    refresh_overlay(scene)
+
+
+def refresh_overlay(scene):
+    vertices = timed_vertices(scene)
+    lasts = [v.timer().last for v in vertices if v.timer().last is not None]
+    _slowest[scene] = max(lasts) if lasts else 0.
+    for v in vertices:
+        v.update_timing_overlay()
+
+
+def reset_timings(scene):
+    for v in timed_vertices(scene):
+        v.timer().reset()
+    refresh_overlay(scene)
+
+
+#######################
+# Slowest nodes table #
+#######################
+class _NumericItem(QtWidgets.QTableWidgetItem):
+    """ Table item sorted on its numeric value """
+
+    def __init__(self, value, text):
+        QtWidgets.QTableWidgetItem.__init__(self, text)
+        self.value = -1. if value is None else value
+        self.setTextAlignment(int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter))
+
+    def __lt__(self, other):
+        return self.value < getattr(other, "value", 0.)
+
+
+class SlowestNodesTable(QtWidgets.QTableWidget):
+    """ Sortable table of the execution timings of the vertices of a scene """
+
+    headers = ["Node", "Id", "Runs", "Last", "Mean", "Total"]
+
+    def __init__(self, scene, parent=None):
+        QtWidgets.QTableWidget.__init__(self, 0, len(self.headers), parent)
+        self.setHorizontalHeaderLabels(self.headers)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.verticalHeader().hide()
+        self.__scene = weakref.ref(scene)
+        self.cellDoubleClicked.connect(self.__select_vertex)
+        self.refresh()
+
+    def refresh(self):
+        scene = self.__scene()
+        if scene is None:
+            return
+        self.setSortingEnabled(False)
+        vertices = [v for v in timed_vertices(scene) if v.timer().count]
+        self.setRowCount(len(vertices))
+        for row, v in enumerate(vertices):
+            t = v.timer()
+            vid = v.vertex().get_id()
+            name = QtWidgets.QTableWidgetItem(v.vertex().get_caption())
+            name.setData(QtCore.Qt.UserRole, vid)
+            self.setItem(row, 0, name)
+            self.setItem(row, 1, _NumericItem(vid, str(vid)))
+            self.setItem(row, 2, _NumericItem(t.count, str(t.count)))
+            self.setItem(row, 3, _NumericItem(t.last, format_duration(t.last)))
+            self.setItem(row, 4, _NumericItem(t.mean(), format_duration(t.mean())))
+            self.setItem(row, 5, _NumericItem(t.total, format_duration(t.total)))
+        self.setSortingEnabled(True)
+        self.sortItems(3, QtCore.Qt.DescendingOrder)
+        self.resizeColumnsToContents()
+
+    def __select_vertex(self, row, column):
+        scene = self.__scene()
+        if scene is None:
+            return
+        vid = self.item(row, 0).data(QtCore.Qt.UserRole)
+        for v in timed_vertices(scene):
+            if v.vertex().get_id() == vid:
+                scene.clearSelection()
+                v.setSelected(True)
+                for view in scene.views():
+                    view.ensureVisible(v)
+                break
+
+
+class SlowestNodesDialog(QtWidgets.QDialog):
+
+    def __init__(self, scene, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+        self.setWindowTitle("Slowest nodes")
+        self.table = SlowestNodesTable(scene, self)
+
+        refreshButton = QtWidgets.QPushButton("Refresh", self)
+        resetButton = QtWidgets.QPushButton("Reset timings", self)
+        refreshButton.clicked.connect(self.table.refresh)
+        resetButton.clicked.connect(lambda: (reset_timings(scene), self.table.refresh()))
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(resetButton)
+        buttons.addWidget(refreshButton)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(3, 3, 3, 3)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        self.resize(480, 360)
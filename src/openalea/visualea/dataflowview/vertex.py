@@ -22,17 +22,82 @@ from qtpy import QtWidgets, QtGui, QtCore, QtSvg
 from openalea.visualea.graph_operator import GraphOperator
 from openalea.core import observer, compositenode
 from openalea.core.node import InputPort, OutputPort, AbstractPort, AbstractNode
-from openalea.core.settings import Settings
 from openalea.grapheditor import qtgraphview, baselisteners, qtutils
 from openalea.grapheditor.qtutils import mixin_method, safeEffects
 from openalea.visualea import images_rc
+from openalea.visualea.evaluation import (get_evaluation_engine, is_gui_thread,
+                                          post_to_gui_thread, install_continuous_evaluation)
+from openalea.visualea.uisettings import get_ui_settings
+from openalea.visualea import resultcache, valuesummary
+from openalea.visualea.dataflowview import timing, portindex
+from openalea.visualea.dataflowview.paintcache import get_paint_resources
 from functools import reduce
+from collections import deque
+import threading
+import weakref
 
 
 """
 """
 
 
+###################
+# Level of detail #
+###################
+# Below this scale vertices are drawn as flat boxes, without ports, texts
+# or shadows.
+LOW_DETAIL_LEVEL = 0.4
+
+
+#####################
+# Deferred geometry #
+#####################
+# scene -> vertices whose geometry refresh is pending
+_pendingGeometry = weakref.WeakKeyDictionary()
+
+
+def flush_geometry(scene):
+    """ Apply the pending geometry refreshes of the vertices of scene, before
+    reading the geometry of its items (layout, export...) """
+    if scene is None:
+        return
+    pending = _pendingGeometry.pop(scene, None)
+    for item in list(pending or ()):
+        item.flush_geometry()
+
+
+def is_low_detail(painter):
+    """ True if the painter is zoomed out enough to skip the details """
+    lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+    return lod < LOW_DETAIL_LEVEL
+
+
+class DetailTextItem(QtWidgets.QGraphicsSimpleTextItem):
+    """ Text that is not drawn when zoomed out """
+
+    def paint(self, painter, option, widget):
+        if not is_low_detail(painter):
+            QtWidgets.QGraphicsSimpleTextItem.paint(self, painter, option, widget)
+
+
+class DetailSvgItem(QtSvg.QGraphicsSvgItem):
+    """ Svg image that is not drawn when zoomed out """
+
+    def paint(self, painter, option, widget):
+        if not is_low_detail(painter):
+            QtSvg.QGraphicsSvgItem.paint(self, painter, option, widget)
+
+
+class DetailDropShadowEffect(QtWidgets.QGraphicsDropShadowEffect):
+    """ Drop shadow that is not drawn when zoomed out """
+
+    def draw(self, painter):
+        if is_low_detail(painter):
+            self.drawSource(painter)
+        else:
+            QtWidgets.QGraphicsDropShadowEffect.draw(self, painter)
+
+
 class EvalObserver(observer.AbstractListener):
 
     def __init__(self, callback):
@@ -44,6 +109,103 @@ class EvalObserver(observer.AbstractListener):
             self.callback(sender, event)
 
 
+class EvalCueQueue(QtCore.QObject):
+    """ Collects the start_eval/stop_eval events of the vertices and
+    updates their busy markers at most once per frame.
+
+    Events can be pushed from any thread. They are drained in the GUI thread
+    by a single shot timer so that a long evaluation never pumps the event
+    loop itself. The queue must live in the GUI thread, which owns its
+    timer, see get_eval_cue_queue.
+    """
+
+    frameInterval = 33  # ms, ~30 updates per second
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+        self.__pending = deque()
+        self.__scheduled = False
+        self.__lock = threading.Lock()
+        self.__busy = weakref.WeakSet()
+        self.__timer = QtCore.QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(self.frameInterval)
+        self.__timer.timeout.connect(self.drain)
+
+    def push(self, item, eventTopKey):
+        with self.__lock:
+            self.__pending.append((item, eventTopKey))
+            if self.__scheduled:
+                return
+            self.__scheduled = True
+        if is_gui_thread():
+            self.__schedule()
+        else:
+            post_to_gui_thread(self.__schedule, None, None)
+
+    def __schedule(self, *args):
+        if not self.__timer.isActive():
+            self.__timer.start()
+
+    def drain(self):
+        """ Apply all the pending events, the last event of a vertex wins """
+        with self.__lock:
+            self.__scheduled = False
+            pending = list(self.__pending)
+            self.__pending.clear()
+        states = {}
+        for item, key in pending:
+            stopped = states.get(item, (False, False))[1]
+            states[item] = (key == "start_eval", stopped or key == "stop_eval")
+
+        showBusy = get_ui_settings().eval_cue
+        for item, (busy, stopped) in states.items():
+            if busy:
+                self.__busy.add(item)
+            else:
+                self.__busy.discard(item)
+            try:
+                item.apply_eval_cue(busy and showBusy, stopped)
+            except RuntimeError:
+                # the item was deleted in the meantime
+                pass
+
+    def release(self, node):
+        """ Hide the markers still shown once the evaluation of node is over.
+
+        Several vertices can be busy at once with the concurrent evaluators;
+        those interrupted by an error or a cancellation never send stop_eval.
+        """
+        self.drain()
+        for item in list(self.__busy):
+            try:
+                scene = item.scene()
+                if item.vertex() is node or (scene is not None and scene.get_graph() is node):
+                    self.__busy.discard(item)
+                    item.apply_eval_cue(False, False)
+            except RuntimeError:
+                self.__busy.discard(item)
+
+
+_eval_cue_queue = None
+_eval_cue_lock = threading.Lock()
+
+
+def get_eval_cue_queue():
+    """ Return the queue, created once; the vertices create it in the GUI
+    thread, before they can be notified by an evaluation thread """
+    global _eval_cue_queue
+    with _eval_cue_lock:
+        if _eval_cue_queue is None:
+            queue = EvalCueQueue()
+            app = QtCore.QCoreApplication.instance()
+            if app is not None:
+                queue.moveToThread(app.thread())
+            get_evaluation_engine().evaluationFinished.connect(queue.release)
+            _eval_cue_queue = queue
+    return _eval_cue_queue
+
+
 class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
                                   qtutils.AleaQGraphicsRoundedRectItem,
                                   ):
@@ -58,6 +220,7 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
     default_error_color = QtGui.QColor(255, 0, 0, 255)
     default_user_application_color = QtGui.QColor(255, 144, 0, 200)
     default_unlazy_color = QtGui.QColor(200, 255, 160, 255)
+    default_cached_color = QtGui.QColor(160, 210, 255, 255)
 
     # gradient stops
     startPos = 0.0
@@ -80,6 +243,7 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
                                                       self.default_corner_radius, True,
                                                       0, 0, 1, 1, parent)
         qtgraphview.Vertex.__init__(self, vertex, graph)
+        get_eval_cue_queue()
 
         # ----- The colors -----
         self.__topColor = self.default_top_color
@@ -97,7 +261,7 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
                                                      center=True,
                                                      mins=(ph, ph))
         # Caption
-        self._caption = QtWidgets.QGraphicsSimpleTextItem(self)
+        self._caption = DetailTextItem(self)
         self.vLayout.addItem(self._caption)
         # out ports
         self.outPortLayout = qtutils.HorizontalLayout(parent=self.vLayout,
@@ -108,36 +272,28 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
         # Editor
         self.__editor = None
 
+        # geometry refresh scheduled after a burst of port notifications
+        self.__geometryPending = False
+
         # Small dots when the vertex has hidden ports
         hiddenPortItem = HiddenPort(self)
         hiddenPortItem.setVisible(False)
         self.hiddenPortItem = hiddenPortItem
         self.inPortLayout.addFinalItem(hiddenPortItem)
 
-        # Small box when the vertex is busy, beping evaluated
-        self._busyItem = QtWidgets.QGraphicsRectItem(0, 0, 7, 7, self)
-        self._busyItem.setBrush(self.evalColor)
-        self._busyItem.setAcceptedMouseButtons(QtCore.Qt.NoButton)
-        self._busyItem.setVisible(False)
-
-        # Clock image when the vertex has a delay
-        self._delayItem = QtSvg.QGraphicsSvgItem(":icons/clock.svg", self)
-        self._delayItem.setAcceptedMouseButtons(QtCore.Qt.NoButton)
-        self._delayItem.setVisible(False)
-
-        self._delayText = QtWidgets.QGraphicsSimpleTextItem("0", self._delayItem)
-        self._delayText.setFont(QtGui.QFont("ariana", 6))
-        self._delayText.setBrush(QtGui.QBrush(QtGui.QColor(255, 0, 0, 200)))
-        self._delayText.setZValue(self._delayItem.zValue() + 1)
-        self._delayText.setVisible(False)
+        # Decorations, created when they are first shown (see the
+        # "Decorations" section): small box when the vertex is busy, being
+        # evaluated, clock image when the vertex has a delay and execution
+        # timings displayed below the vertex when the overlay is on.
+        self._busyItem = None
+        self._delayItem = None
+        self._delayText = None
+        self._timingText = None
+        self._timer = timing.EvalTimer()
 
         # ----- drawing nicities -----
         self.setPen(QtGui.QPen(QtCore.Qt.black, self.pen_width))
-        if safeEffects:
-            fx = QtWidgets.QGraphicsDropShadowEffect()
-            fx.setOffset(2, 2)
-            fx.setBlurRadius(5)
-            self.setGraphicsEffect(fx)
+        self.materialize_details()
 
     def initialise_from_model(self):
         vertex = self.vertex()
@@ -145,13 +301,15 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
 
         # position/color...
         mdict.simulate_full_data_change(self, vertex)
+        resultcache.apply_result_cache(vertex)
+        if vertex.user_application and self.graph() is not None:
+            install_continuous_evaluation(self.graph(), vertex.get_id())
         userColor = self.get_view_data("userColor")
         if(userColor is None):
             self.store_view_data(useUserColor=False)
 
         # add connectors and configure their visibility
-        for i in vertex.input_desc + vertex.output_desc:
-            self.add_port(i)
+        self.add_ports(vertex.input_desc + vertex.output_desc)
         # once connectors are added we also initialise them
         for c in self.iter_connectors():
             c.initialise_from_model()
@@ -175,6 +333,9 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
     def get_editor_instance(self):
         return self.__editor
 
+    def timer(self):
+        return self._timer
+
     ###########
     # Queries #
     ###########
@@ -193,10 +354,13 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
 
     def update_delay_item(self):
         visible = self.vertex().delay > 0
-        self._delayItem.setVisible(visible and self.isVisible())
-        self._delayText.setVisible(visible and self.isVisible())
+        if not visible and self._delayItem is None:
+            return
+        delayItem, delayText = self.delay_items()
+        delayItem.setVisible(visible and self.isVisible())
+        delayText.setVisible(visible and self.isVisible())
         if visible:
-            self._delayText.setText(str(self.vertex().delay))
+            delayText.setText(str(self.vertex().delay))
 
     def update_colors(self):
         self.__topColor = self.default_top_color
@@ -211,6 +375,9 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
             elif self.vertex().user_application:
                 self.__topColor = self.default_user_application_color
                 self.__bottomColor = self.__topColor.darker()
+            elif resultcache.is_cache_enabled(self.vertex()):
+                self.__topColor = self.default_cached_color
+                self.__bottomColor = self.__topColor.darker()
             elif not self.vertex().lazy:
                 self.__topColor = self.default_unlazy_color
                 self.__bottomColor = self.__topColor.darker()
@@ -220,17 +387,92 @@ class ObserverOnlyGraphicalVertex(qtgraphview.Vertex,
                 self.__topColor = QtGui.QColor(*userColor)
                 self.__bottomColor = QtGui.QColor(*userColor)
 
+        scene = self.scene()
+        if timing.overlay_enabled(scene) and self._timer.last is not None:
+            slowest = timing.scene_slowest_duration(scene)
+            ratio = self._timer.last / slowest if slowest > 0. else 0.
+            self.__topColor = timing.heat_color(ratio)
+            self.__bottomColor = self.__topColor.darker(130)
+
         pen = self.pen()
         pen.setColor(self.__penColor)
 
-        gradient = QtGui.QLinearGradient(self.rect().topLeft(),
-                                            self.rect().bottomLeft())
-        gradient.setColorAt(self.startPos, self.__topColor)
-        gradient.setColorAt(self.endPos, self.__bottomColor)
-        brush = QtGui.QBrush(gradient)
-
         self.setPen(pen)
-        self.setBrush(brush)
+        self.setBrush(self.__body_brush(inverted=False))
+
+    def __body_brush(self, inverted):
+        """ Shared gradient brush of the body, inverted for selected items """
+        top, bottom = self.__topColor, self.__bottomColor
+        if inverted:
+            top, bottom = bottom, top
+        return get_paint_resources(self.scene()).vertex_brush(self.rect(), top, bottom,
+                                                              self.startPos, self.endPos)
+
+    def update_timing_overlay(self):
+        visible = timing.overlay_enabled(self.scene()) and self._timer.last is not None
+        if visible or self._timingText is not None:
+            self.timing_item().setVisible(visible)
+        if visible:
+            self._timingText.setText("%s / %s" % (timing.format_duration(self._timer.last),
+                                                  timing.format_duration(self._timer.mean())))
+            self.layout_items()
+        self.update_colors()
+
+    def apply_eval_cue(self, busy, stopped):
+        """ Called by the eval cue queue with the latest evaluation state """
+        if busy or self._busyItem is not None:
+            self.busy_item().setVisible(busy and self.isVisible())
+        if stopped and timing.overlay_enabled(self.scene()):
+            if timing.update_slowest_duration(self.scene(), self._timer.last):
+                timing.refresh_overlay(self.scene())
+            else:
+                self.update_timing_overlay()
+
+    ###############
+    # Decorations #
+    ###############
+    def busy_item(self):
+        if self._busyItem is None:
+            self._busyItem = QtWidgets.QGraphicsRectItem(0, 0, 7, 7, self)
+            self._busyItem.setBrush(self.evalColor)
+            self._busyItem.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+            self._busyItem.setVisible(False)
+        return self._busyItem
+
+    def delay_items(self):
+        if self._delayItem is None:
+            self._delayItem = DetailSvgItem(":icons/clock.svg", self)
+            self._delayItem.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+            self._delayItem.setVisible(False)
+
+            self._delayText = DetailTextItem("0", self._delayItem)
+            self._delayText.setFont(QtGui.QFont("ariana", 6))
+            self._delayText.setBrush(QtGui.QBrush(QtGui.QColor(255, 0, 0, 200)))
+            self._delayText.setZValue(self._delayItem.zValue() + 1)
+            self._delayText.setVisible(False)
+            self.layout_items()
+        return self._delayItem, self._delayText
+
+    def timing_item(self):
+        if self._timingText is None:
+            self._timingText = DetailTextItem(self)
+            self._timingText.setFont(QtGui.QFont("ariana", 6))
+            self._timingText.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+            self._timingText.setVisible(False)
+        return self._timingText
+
+    def materialize_details(self):
+        """ Create the drop shadow, and the delay clock and timing text if
+        they are shown """
+        if safeEffects and self.graphicsEffect() is None:
+            fx = DetailDropShadowEffect()
+            fx.setOffset(2, 2)
+            fx.setBlurRadius(5)
+            self.setGraphicsEffect(fx)
+        if self.scene() is not None:
+            self.update_delay_item()
+            if timing.overlay_enabled(self.scene()):
+                self.update_timing_overlay()
 
     def set_graphical_caption(self, caption):
         """Sets the name displayed in the vertex widget, doesn't change
@@ -264,12 +506,21 @@ the vertex data"""
         """ Notification sent by the vertex associated to the item """
         if event is None:
             return
+        if event[0] in ("start_eval", "stop_eval"):
+            # -- timestamps are taken in the evaluating thread, the busy
+            # marker is updated later by the eval cue queue --
+            self._timer.record(event[0])
+            get_eval_cue_queue().push(self, event[0])
+            return
+        if not is_gui_thread():
+            # -- sent by an evaluation thread --
+            post_to_gui_thread(self.process_notification, sender, event)
+            return
+        self.process_notification(sender, event)
 
-        try:
-            refresh = eval(Settings().get("UI", "EvalCue"))
-        except:
-            refresh = True
-
+    def process_notification(self, sender, event):
+        """ Update the item according to a notification of the vertex.
+        Always called from the GUI thread. """
         eventTopKey = event[0]
         if eventTopKey == "close":
             if self.__editor:
@@ -290,7 +541,7 @@ the vertex data"""
                     self.store_view_data(useUserColor=False)
                 else:
                     self.update_colors()
-            elif event[1] == "useUserColor":
+            elif event[1] == "useUserColor" or event[1] == resultcache.CACHE_KEY:
                 self.update_colors()
         elif eventTopKey == "exception_state_changed":
             self.update_colors()
@@ -298,17 +549,10 @@ the vertex data"""
             self.update_hidden_port_item()
         elif(eventTopKey == "tooltip_modified"):
             self.set_graphical_tooltip(event[1])
-        if refresh:
-            if(eventTopKey == "start_eval"):
-                self._busyItem.setVisible(self.isVisible())
-                QtWidgets.QApplication.processEvents()
-            elif(eventTopKey == "stop_eval"):
-                self._busyItem.setVisible(False)
-                QtWidgets.QApplication.processEvents()
         elif(eventTopKey == "input_port_added"):
-            self.add_port(event[1])
+            self.add_ports([event[1]], deferred=True)
         elif(eventTopKey == "output_port_added"):
-            self.add_port(event[1])
+            self.add_ports([event[1]], deferred=True)
         elif(eventTopKey == "cleared_input_ports"):
             self.remove_ports(lambda x: isinstance(x.port(), InputPort))
         elif(eventTopKey == "cleared_output_ports"):
@@ -322,36 +566,45 @@ the vertex data"""
     # operation in the GUI. #
     #######################################
     def add_port(self, modelPort):
-        if isinstance(modelPort, InputPort):
-            l = self.inPortLayout
-        elif isinstance(modelPort, OutputPort):
-            l = self.outPortLayout
-        if modelPort not in l:
-            gp = GraphicalPort(self, modelPort)
-            if gp:
-                l.addItem(gp)
-                self.add_connector(gp)
-                self.refresh_geometry()
+        self.add_ports([modelPort])
+
+    def add_ports(self, modelPorts, deferred=False):
+        """ Add the connectors of modelPorts and lay out the vertex once.
+        If deferred, the layout is done when control returns to the event loop,
+        so that successive calls are laid out once too. """
+        added = False
+        for modelPort in modelPorts:
+            if isinstance(modelPort, InputPort):
+                l = self.inPortLayout
+            elif isinstance(modelPort, OutputPort):
+                l = self.outPortLayout
+            if modelPort not in l:
+                gp = GraphicalPort(self, modelPort)
+                if gp:
+                    l.addItem(gp)
+                    self.add_connector(gp)
+                    added = True
+        if not added:
+            return
+        if deferred:
+            self.schedule_geometry_refresh()
+        else:
+            self.refresh_geometry()
 
     def remove_port(self, modelPort):
-        if isinstance(modelPort, InputPort):
-            l = self.inPortLayout
-        elif isinstance(modelPort, OutputPort):
-            l = self.outPortLayout
-        for gp in l._items[:]:
-            if gp.port() == modelPort:
-                l.removeItem(gp)
-                gp.remove_from_view(self.scene())
-                self.remove_connector(gp)
-                del gp
-                self.refresh_geometry()
+        self.remove_ports(lambda x: x.port() == modelPort)
 
     def remove_ports(self, filter=lambda x: True):
+        """ Remove the connectors matching filter and lay out the vertex once """
+        removed = False
         for con in list(self.iter_connectors(filter)):
             l = self.inPortLayout if isinstance(con.port(), InputPort) else self.outPortLayout
             l.removeItem(con)
             con.remove_from_view(self.scene())
             self.remove_connector(con)
+            removed = True
+        if removed:
+            self.refresh_geometry()
 
     #####################################################################
     # Code related to the layout of subitems and geometry of the vertex #
@@ -359,17 +612,42 @@ the vertex data"""
     def layout_items(self):
         geom = self.vLayout.boundingRect(force=True)
         self.vLayout.setPos(QtCore.QPointF(0., 0.))
-        self._busyItem.setPos(0, 0)
-
-        diBr = self._delayItem.boundingRect()
-        dtBr = self._delayText.boundingRect()
-        self._delayItem.setPos(-diBr.width() / 2 - self.delayMargins,
-                               (geom.height() - diBr.height()) / 2)
-        self._delayText.setPos((diBr.width() - dtBr.width()) / 2,
-                               (diBr.height() - dtBr.height()) / 2)
+        if self._busyItem is not None:
+            self._busyItem.setPos(0, 0)
+
+        if self._delayItem is not None:
+            diBr = self._delayItem.boundingRect()
+            dtBr = self._delayText.boundingRect()
+            self._delayItem.setPos(-diBr.width() / 2 - self.delayMargins,
+                                   (geom.height() - diBr.height()) / 2)
+            self._delayText.setPos((diBr.width() - dtBr.width()) / 2,
+                                   (diBr.height() - dtBr.height()) / 2)
+        if self._timingText is not None and self._timingText.isVisible():
+            ttBr = self._timingText.boundingRect()
+            self._timingText.setPos((geom.width() - ttBr.width()) / 2,
+                                    geom.height() + self.pen_width)
         return geom
 
+    def schedule_geometry_refresh(self):
+        if not self.__geometryPending:
+            self.__geometryPending = True
+            scene = self.scene()
+            if scene is not None:
+                _pendingGeometry.setdefault(scene, weakref.WeakSet()).add(self)
+            QtCore.QTimer.singleShot(0, self.flush_geometry)
+
+    def flush_geometry(self):
+        """ Refresh the geometry now if a refresh is pending """
+        if not self.__geometryPending:
+            return
+        try:
+            self.refresh_geometry()
+        except RuntimeError:
+            # the item was deleted in the meantime
+            pass
+
     def refresh_geometry(self):
+        self.__geometryPending = False
         halfPortH = GraphicalPort.HEIGHT / 2
         geom = self.layout_items().adjusted(-self.pen_width,
                                             halfPortH - self.pen_width,
@@ -382,6 +660,12 @@ the vertex data"""
     # Drawing Code #
     ################
     def paint(self, painter, options, widget):
+        if is_low_detail(painter):
+            painter.setPen(self.pen())
+            painter.setBrush(self.__topColor)
+            painter.drawRect(self.rect())
+            return
+
         path = self.shape()
         pen = self.pen()
         brush = self.brush()
@@ -401,22 +685,15 @@ the vertex data"""
         if change == QtWidgets.QGraphicsItem.ItemSelectedChange:
             selected = bool(value)
             pen = self.pen()
-            brush = self.brush()
-            gradient = brush.gradient()
             if selected:
                 pen.setColor(self.default_pen_selected_color)
-                if gradient:  # invert the gradient
-                    gradient.setColorAt(self.endPos, self.__topColor)
-                    gradient.setColorAt(self.startPos, self.__bottomColor)
                 scene = self.scene()
                 scene.focusedItemChanged.emit(scene, self)
             else:
                 pen.setColor(self.default_pen_color)
-                if gradient:  # invert the gradient
-                    gradient.setColorAt(self.startPos, self.__topColor)
-                    gradient.setColorAt(self.endPos, self.__bottomColor)
             self.setPen(pen)
-            self.setBrush(brush)
+            # the gradient is inverted when selected
+            self.setBrush(self.__body_brush(inverted=selected))
 
         qtgraphview.Vertex.itemChange(self, change, value)
         return QtWidgets.QGraphicsRectItem.itemChange(self, change, value)
@@ -432,20 +709,15 @@ class GraphicalVertex(ObserverOnlyGraphicalVertex):
 
     def mouseDoubleClickEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton:
-            # Read settings
-            try:
-                localsettings = Settings()
-                str = localsettings.get("UI", "DoubleClick")
-            except:
-                str = "['open']"
+            actions = get_ui_settings().double_click
 
             operator = GraphOperator(graph=self.graph(),
                                      graphScene=self.scene())
             operator.set_vertex_item(self)
 
-            if('open' in str):
+            if('open' in actions):
                 operator(fName="vertex_open")()
-            elif('run' in str):
+            elif('run' in actions):
                 operator(fName="vertex_run")()
 
     def contextMenuEvent(self, event):
@@ -489,6 +761,12 @@ class GraphicalVertex(ObserverOnlyGraphicalVertex):
         action.setChecked(self.vertex().block)
         menu.addAction(action)
 
+        action = operator("Cache results", menu, "vertex_cache_results")
+        action.setCheckable(True)
+        action.setChecked(resultcache.is_cache_enabled(self.vertex()))
+        action.setEnabled(resultcache.is_cacheable(self.vertex()))
+        menu.addAction(action)
+
         menu.addAction(operator("Internals", menu, "vertex_edit_internals"))
         menu.addSeparator()
 
@@ -600,14 +878,18 @@ class HiddenPort (QtWidgets.QGraphicsItem):
         size = self.size()
         return QtCore.QRectF(pos, size)
 
+    __brush = QtGui.QBrush(QtGui.QColor(50, 50, 50, 200))
+    __pen = QtGui.QPen(QtCore.Qt.black, 0)
+    __dots = [QtCore.QRectF(i * 5., 0., 4., 4.) for i in (0, 1, 2)]
+
     def paint(self, painter, option, widget):
-        if not self.isVisible():
+        if not self.isVisible() or is_low_detail(painter):
             return
         painter.setBackgroundMode(QtCore.Qt.TransparentMode)
-        painter.setBrush(QtGui.QBrush(QtGui.QColor(50, 50, 50, 200)))
-        painter.setPen(QtGui.QPen(QtCore.Qt.black, 0))
-        for i in (0, 1, 2):
-            painter.drawEllipse(QtCore.QRectF(i * 5., 0., 4., 4.))
+        painter.setBrush(self.__brush)
+        painter.setPen(self.__pen)
+        for dot in self.__dots:
+            painter.drawEllipse(dot)
 
 
 # --------------------------- ConnectorType ---------------------------------
@@ -617,6 +899,7 @@ class GraphicalPort(QtWidgets.QGraphicsEllipseItem, qtgraphview.Connector):
     MAX_TIPLEN = 400
     WIDTH = 7.0
     HEIGHT = 7.0
+    __paintRect = QtCore.QRectF(0, 0, WIDTH, HEIGHT)
 
     def __init__(self, parent, port):
         """
@@ -624,7 +907,12 @@ class GraphicalPort(QtWidgets.QGraphicsEllipseItem, qtgraphview.Connector):
         QtWidgets.QGraphicsEllipseItem.__init__(self, 0, 0, self.WIDTH, self.HEIGHT, parent)
         qtgraphview.Connector.__init__(self, observed=port)
         self.__interfaceColor = None
+        # built when the port is hovered, dropped when its value changes
+        self.__tooltip = None
+        self.setAcceptHoverEvents(True)
         self.set_connection_modifiers(QtCore.Qt.NoModifier)
+        # keeps the connector index of the scene up to date
+        self.setFlag(QtWidgets.QGraphicsItem.ItemSendsScenePositionChanges)
         self.initialise_from_model()
 
     port = baselisteners.GraphElementListenerBase.get_observed
@@ -650,6 +938,9 @@ class GraphicalPort(QtWidgets.QGraphicsEllipseItem, qtgraphview.Connector):
         del self
 
     def notify(self, sender, event):
+        if not is_gui_thread():
+            post_to_gui_thread(self.notify, sender, event)
+            return
         try:
             self.port()
         except:
@@ -658,7 +949,9 @@ class GraphicalPort(QtWidgets.QGraphicsEllipseItem, qtgraphview.Connector):
             return
 
         if(event[0] in ["tooltip_modified", "stop_eval"]):
-            self.__update_tooltip()
+            self.__tooltip = None
+            if self.isUnderMouse():
+                self.__update_tooltip()
         elif(event[0] == "metadata_changed"):
             if(sender == self.port()):
                 if(event[1] == "hide"):
@@ -674,21 +967,23 @@ class GraphicalPort(QtWidgets.QGraphicsEllipseItem, qtgraphview.Connector):
         return
 
     def __update_tooltip(self):
-        node = self.port().vertex()
-        if isinstance(self.port(), OutputPort):
-            data = node.get_output(self.port().get_id())
-        elif isinstance(self.port(), InputPort):
-            data = node.get_input(self.port().get_id())
-        try:
-            s = str(data)
-        except:
-            s = ''
-        if(len(s) > self.MAX_TIPLEN):
-            s = "String too long..."
-            self.setToolTip(s)
-        else:
-            #self.setToolTip("Value: " + s)
-            self.setToolTip(self.port().get_tip(data))
+        port = self.port()
+        node = port.vertex()
+        data = None
+        if isinstance(port, OutputPort):
+            data = node.get_output(port.get_id())
+        elif isinstance(port, InputPort):
+            data = node.get_input(port.get_id())
+        # the port only describes its default value, the current one is
+        # summarized without building its full repr.
+        tip = port.get_tip()
+        if data is not None:
+            try:
+                tip = "Value: " + valuesummary.summarize(data, self.MAX_TIPLEN) + "\n" + tip
+            except Exception:
+                pass
+        self.__tooltip = tip
+        self.setToolTip(tip)
 
     def get_id(self):
         return self.port().get_id()
@@ -709,26 +1004,31 @@ class GraphicalPort(QtWidgets.QGraphicsEllipseItem, qtgraphview.Connector):
             menu.move(event.screenPos())
             event.accept()
 
+    def hoverEnterEvent(self, event):
+        if self.__tooltip is None:
+            self.__update_tooltip()
+        QtWidgets.QGraphicsEllipseItem.hoverEnterEvent(self, event)
+
     def paint(self, painter, option, widget):
-        if(not self.isVisible()):
+        if(not self.isVisible()) or is_low_detail(painter):
             return
-        pos = self.pos()
+        resources = get_paint_resources(self.scene())
         painter.setBackgroundMode(QtCore.Qt.TransparentMode)
-        gradient = QtGui.QLinearGradient(0, 0, 10, 0)
-        if self.highlighted:
-            gradient.setColorAt(1, QtGui.QColor(QtCore.Qt.red).lighter(120))
-            gradient.setColorAt(0, QtGui.QColor(QtCore.Qt.darkRed).lighter(120))
-        else:
-            if self.__interfaceColor is None:
-                gradient.setColorAt(0.8, QtGui.QColor(QtCore.Qt.yellow).lighter(120))
-                gradient.setColorAt(0.2, QtGui.QColor(QtCore.Qt.darkYellow).lighter(120))
-            else:
-                gradient.setColorAt(0.8, self.__interfaceColor.lighter(120))
-                gradient.setColorAt(0.2, self.__interfaceColor.lighter(120))
+        painter.setBrush(resources.port_brush(self.__interfaceColor, self.highlighted))
+        painter.setPen(resources.outlinePen)
+        painter.drawEllipse(self.__paintRect)
 
-        painter.setBrush(QtGui.QBrush(gradient))
-        painter.setPen(QtGui.QPen(QtCore.Qt.black, 0))
-        painter.drawEllipse(QtCore.QRectF(0, 0, self.WIDTH, self.HEIGHT))
+    _base_itemChange = mixin_method(qtgraphview.Connector, QtWidgets.QGraphicsItem,
+                                    "itemChange")
 
-    itemChange = mixin_method(qtgraphview.Connector, QtWidgets.QGraphicsItem,
-                              "itemChange")
+    def itemChange(self, change, value):
+        if change in (QtWidgets.QGraphicsItem.ItemScenePositionHasChanged,
+                      QtWidgets.QGraphicsItem.ItemVisibleHasChanged,
+                      QtWidgets.QGraphicsItem.ItemSceneHasChanged):
+            portindex.update_connector(self)
+        return self._base_itemChange(change, value)
+
+    def set_highlighted(self, highlighted):
+        if self.highlighted != highlighted:
+            self.highlighted = highlighted
+            self.update()
@@ -32,6 +32,7 @@ from openalea.core.settings import Settings, get_userpkg_dir
 from openalea.core.interface import *
 from openalea.core.session import Session
 from openalea.core.node import Factory, Node
+from openalea.visualea.uisettings import get_ui_settings, invalidate_ui_settings
 
 
 for name in [
@@ -548,79 +549,40 @@ class PreferencesDialog(QtWidgets.QDialog, ui_preferences.Ui_Preferences):
         self.setupUi(self)
 
         # Read config
-        config = Settings()
+        settings = get_ui_settings()
         self.session = parent.session
 
         # pkgmanager
-        try:
-            str = config.get("pkgmanager", "path")
-            l = eval(str)
-
-            for p in l:
-                self.pathList.addItem(p)
-        except:
-            pass
-
-#        try:
-            #str = config.get("pkgmanager", "include_namespace")
-            #enabled = bool(eval(str))
-
-#            if(enabled):
-#                self.includenmspace.setCheckState(QtCore.Qt.Checked)
-#            else:
-#                self.includenmspace.setCheckState(QtCore.Qt.Unchecked)
-#        except:
-#            pass
+        for p in settings.search_path:
+            self.pathList.addItem(p)
 
         # Editor
-        try:
-            str = config.get("editor", "use_external")
-            l = eval(str)
-            if(l):
-                self.externalBool.setCheckState(QtCore.Qt.Checked)
-            else:
-                self.externalBool.setCheckState(QtCore.Qt.Unchecked)
-        except Exception as e:
-            print(e)
-
-        try:
-            str = config.get("editor", "command")
-            self.commandStr.setText(str)
-        except:
-            pass
+        self.externalBool.setCheckState(QtCore.Qt.Checked if settings.use_external_editor
+                                        else QtCore.Qt.Unchecked)
+        self.commandStr.setText(settings.editor_command)
 
         self.commandPath.clicked.connect(self.select_editor)
 
         # UI
-        try:
-            str = config.get("UI", "DoubleClick")
-            l = eval(str)
-            if("run" in l and "open" in l):
-                self.dbclickBox.setCurrentIndex(0)
-            elif("run" in l):
-                self.dbclickBox.setCurrentIndex(1)
-            elif("open" in l):
-                self.dbclickBox.setCurrentIndex(2)
-        except:
+        l = settings.double_click
+        if("run" in l and "open" in l):
+            self.dbclickBox.setCurrentIndex(0)
+        elif("run" in l):
+            self.dbclickBox.setCurrentIndex(1)
+        else:
             self.dbclickBox.setCurrentIndex(2)
 
-        try:
-            self.edge_style = config.get("UI", "EdgeStyle")
-            if(self.edge_style == "Spline"):
-                self.comboBox.setCurrentIndex(0)
-            elif(self.edge_style == "Polyline"):
-                self.comboBox.setCurrentIndex(1)
-            elif(self.edge_style == "Line"):
-                self.comboBox.setCurrentIndex(2)
-        except:
-            self.edge_style = "Spline"
+        self.edge_style = settings.edge_style
+        if(self.edge_style == "Spline"):
+            self.comboBox.setCurrentIndex(0)
+        elif(self.edge_style == "Polyline"):
+            self.comboBox.setCurrentIndex(1)
+        elif(self.edge_style == "Line"):
+            self.comboBox.setCurrentIndex(2)
 
-        try:
-            showCue = eval(config.get("UI", "EvalCue"))
-            self.evalCue.setCheckState(QtCore.Qt.Checked if showCue
-                                       else QtCore.Qt.Unchecked)
-        except:
-            self.evalCue.setCheckState(QtCore.Qt.Unchecked)
+        self.evalCue.setCheckState(QtCore.Qt.Checked if settings.eval_cue
+                                   else QtCore.Qt.Unchecked)
+        self.evalDelay.setValue(settings.continuous_eval_delay)
 
         self.addButton.clicked.connect(self.add_search_path)
         self.removeButton.clicked.connect(self.remove_search_path)
@@ -664,6 +626,7 @@ class PreferencesDialog(QtWidgets.QDialog, ui_preferences.Ui_Preferences):
             pkgmanager.add_wralea_path(os.path.abspath(str(path)), pkgmanager.user_wralea_path)
 
         pkgmanager.write_config()
+        invalidate_ui_settings()
 
     def valid_ui(self):
         """ Valid UI Parameters """
@@ -679,7 +642,9 @@ class PreferencesDialog(QtWidgets.QDialog, ui_preferences.Ui_Preferences):
         config.set("UI", "DoubleClick", repr(d[index]))
         config.set("UI", "EdgeStyle", edge_style)
         config.set("UI", "EvalCue", str(self.evalCue.checkState() == QtCore.Qt.Checked))
+        config.set("UI", "ContinuousEvalDelay", str(self.evalDelay.value()))
         config.write()
+        invalidate_ui_settings()
 
         if edge_style != self.edge_style:
             self.edge_style = edge_style
@@ -698,6 +663,7 @@ class PreferencesDialog(QtWidgets.QDialog, ui_preferences.Ui_Preferences):
         config.set("editor", "use_external", repr(use_ext))
         config.set("editor", "command", command)
         config.write()
+        invalidate_ui_settings()
 
     def accept(self):
         """ Validate dialog results """
@@ -1020,7 +986,12 @@ class NodeChooser(QtWidgets.QDialog, ui_nodechooser.Ui_NodeChooser):
         @param nb_outputs
         """
 
-        res = self.pman.search_node(name, nb_inputs, nb_outputs)
+        from openalea.visualea.factorysearch import get_factory_search, ports_match
+
+        res = get_factory_search().search(name, accept=lambda f: ports_match(f, nb_inputs, nb_outputs))
+        if res is None:
+            # the index is being built in the background
+            res = self.pman.search_node(name, nb_inputs, nb_outputs)
         strs = []
 
         for f in res:
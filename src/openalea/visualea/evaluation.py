@@ -0,0 +1,327 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Background evaluation of dataflows.
+
+Evaluations are run in a QThread so that the GUI keeps repainting while a
+long dataflow is computed. Model notifications emitted by the worker thread
+are relayed to the GUI thread with :func:`post_to_gui_thread` before any
+graphics item is touched.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import threading
+import weakref
+
+from qtpy import QtCore
+from openalea.core import logger
+from openalea.core.observer import AbstractListener
+from openalea.core.algo.dataflow_evaluation import EvaluationException
+from openalea.visualea.util import exception_display
+from openalea.visualea.uisettings import get_ui_settings
+
+
+class EvaluationCancelled(Exception):
+    """Raised in the evaluation thread when the user stops an evaluation."""
+    pass
+
+
+###########################################
+# Marshalling notifications to GUI thread #
+###########################################
+def is_gui_thread():
+    """ Return True if called from the thread running the Qt event loop """
+    app = QtCore.QCoreApplication.instance()
+    if app is None:
+        return True
+    return QtCore.QThread.currentThread() == app.thread()
+
+
+class _GuiRelay(QtCore.QObject):
+    """ Lives in the GUI thread and calls back functions posted from other threads """
+
+    relayed = QtCore.Signal(object, object, object)
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+        self.relayed.connect(self.__call, QtCore.Qt.QueuedConnection)
+
+    def __call(self, func, sender, event):
+        try:
+            func(sender, event)
+        except RuntimeError:
+            # the underlying C++ item was deleted in the meantime.
+            pass
+
+
+_relay = None
+_relay_lock = threading.Lock()
+
+
+def get_gui_relay():
+    """ Return the relay, created once; get_evaluation_engine creates it in
+    the GUI thread before any evaluation runs """
+    global _relay
+    with _relay_lock:
+        if _relay is None:
+            _relay = _GuiRelay()
+            app = QtCore.QCoreApplication.instance()
+            if app is not None:
+                _relay.moveToThread(app.thread())
+    return _relay
+
+
+def post_to_gui_thread(func, sender, event):
+    """ Queue func(sender, event) to be called by the GUI event loop """
+    get_gui_relay().relayed.emit(func, sender, event)
+
+
+#####################
+# Evaluation thread #
+#####################
+class _CancelObserver(object):
+    """ Listens to the nodes of an evaluation and aborts it on start_eval
+    once the evaluation has been cancelled """
+
+    def __init__(self, thread):
+        self.thread = weakref.ref(thread)
+        self.listener = None
+        self.observed = []
+
+    def attach(self, nodes):
+        from openalea.visualea.dataflowview.vertex import EvalObserver
+        self.listener = EvalObserver(self.check)
+        for n in nodes:
+            n.register_listener(self.listener)
+            self.observed.append(n)
+
+    def detach(self):
+        for n in self.observed:
+            try:
+                n.unregister_listener(self.listener)
+            except Exception:
+                pass
+        self.observed = []
+        self.listener = None
+
+    def check(self, sender, event):
+        thread = self.thread()
+        if thread is not None and thread.cancelled:
+            raise EvaluationCancelled()
+
+
+class EvaluationThread(QtCore.QThread):
+    """ Evaluates a node (or a vertex of a composite node) in a worker thread """
+
+    def __init__(self, node, vtx_id=None, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self.node = node
+        self.vtx_id = vtx_id
+        self.cancelled = False
+        self.exception = None
+        self.__observer = _CancelObserver(self)
+
+    def nodes(self):
+        """ Return the nodes whose evaluation can be interrupted """
+        node = self.node
+        if hasattr(node, "eval_as_expression"):
+            return [node.node(vid) for vid in node.vertices()]
+        return [node]
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        self.__observer.attach(self.nodes())
+        try:
+            if hasattr(self.node, "eval_as_expression"):
+                self.node.eval_as_expression(self.vtx_id)
+            else:
+                self.node.eval()
+        except Exception as e:
+            self.exception = e
+        finally:
+            self.__observer.detach()
+
+
+class EvaluationEngine(QtCore.QObject):
+    """ Runs evaluations off the GUI thread, one at a time per node """
+
+    evaluationStarted = QtCore.Signal(object)
+    evaluationFinished = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.__threads = {}
+
+    def run(self, node, vtx_id=None):
+        """ Start the evaluation of node (restricted to vtx_id for composite
+        nodes). Return False if node is already being evaluated. """
+        if self.is_running(node):
+            return False
+
+        thread = EvaluationThread(node, vtx_id)
+        thread.finished.connect(self.__on_thread_finished)
+        self.__threads[id(node)] = thread
+        self.evaluationStarted.emit(node)
+        thread.start()
+        return True
+
+    def stop(self, node=None):
+        """ Cancel the evaluation of node, or all evaluations if node is None.
+        The evaluation stops before the next vertex is evaluated. """
+        for thread in list(self.__threads.values()):
+            if node is None or thread.node is node:
+                thread.cancel()
+
+    def is_running(self, node=None):
+        if node is None:
+            return len(self.__threads) > 0
+        return id(node) in self.__threads
+
+    def wait(self, node=None):
+        """ Block until the evaluation of node (or of all nodes) is over """
+        for thread in list(self.__threads.values()):
+            if node is None or thread.node is node:
+                thread.wait()
+
+    def __on_thread_finished(self):
+        thread = self.sender()
+        self.__threads.pop(id(thread.node), None)
+        exc = thread.exception
+        if exc is not None:
+            cause = exc
+            while isinstance(cause, EvaluationException):
+                cause = cause.exception
+            if isinstance(cause, EvaluationCancelled):
+                logger.info("Evaluation of %s cancelled" % thread.node.get_caption())
+                self.__clear_error_state(exc)
+            else:
+                self.report_failure(exc)
+        self.evaluationFinished.emit(thread.node)
+        thread.deleteLater()
+
+    @staticmethod
+    def __clear_error_state(exc):
+        # the node that received the cancellation is not in error.
+        while isinstance(exc, EvaluationException):
+            node = getattr(exc, "node", None)
+            if node is not None:
+                node.raise_exception = False
+            exc = exc.exception
+
+    @exception_display
+    def report_failure(self, exc):
+        raise exc
+
+
+_engine = None
+
+
+def get_evaluation_engine():
+    """ Return the evaluation engine shared by all workspaces """
+    global _engine
+    if _engine is None:
+        get_gui_relay()
+        _engine = EvaluationEngine()
+    return _engine
+
+
+#########################
+# Continuous evaluation #
+#########################
+class ContinuousEvaluation(QtCore.QObject):
+    """ Re-evaluates the user application vertices of a dataflow when their
+    inputs change.
+
+    Changes are coalesced: the evaluation starts once no change occurred
+    during the UI/ContinuousEvalDelay setting. A change received while a
+    continuous evaluation of the dataflow runs stops it, and it restarts with
+    the latest inputs. Evaluations started by the user are not stopped: the
+    changes are evaluated once they are over.
+    """
+
+    def __init__(self, dataflow, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.dataflow = weakref.ref(dataflow)
+        self.__pending = []
+        self.__running = False   # the dataflow is evaluated on our behalf
+        self.__timer = QtCore.QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.timeout.connect(self.__fire)
+        get_evaluation_engine().evaluationFinished.connect(self.__on_finished)
+
+    def request(self, vid):
+        """ Schedule the evaluation of vid. Can be called from any thread. """
+        if not is_gui_thread():
+            post_to_gui_thread(lambda sender, event: self.request(vid), None, None)
+            return
+        if vid not in self.__pending:
+            self.__pending.append(vid)
+        self.__timer.start(get_ui_settings().continuous_eval_delay)
+
+    def __fire(self):
+        dataflow = self.dataflow()
+        if dataflow is None or not self.__pending:
+            return
+        engine = get_evaluation_engine()
+        if engine.is_running(dataflow):
+            # evaluated again by __on_finished
+            if self.__running:
+                # superseded
+                engine.stop(dataflow)
+            return
+        self.__running = engine.run(dataflow, self.__pending.pop(0))
+
+    def __on_finished(self, node):
+        if node is not self.dataflow():
+            return
+        self.__running = False
+        if self.__pending and not self.__timer.isActive():
+            self.__fire()
+
+
+class _ContinuousEvalListener(AbstractListener):
+    """ Replaces the listener of openalea.core that evaluates the dataflow
+    synchronously on each change of a user application node """
+
+    def __init__(self, scheduler, vid):
+        AbstractListener.__init__(self)
+        self.scheduler = scheduler
+        self.vid = vid
+
+    def notify(self, sender, event):
+        self.scheduler.request(self.vid)
+
+
+_continuous = weakref.WeakKeyDictionary()
+
+
+def install_continuous_evaluation(dataflow, vid):
+    """ Make the user application vertex vid of dataflow use the debounced
+    background evaluation """
+    node = dataflow.node(vid)
+    old = getattr(node, "continuous_listener", None)
+    if old is None or isinstance(old, _ContinuousEvalListener):
+        return
+    scheduler = _continuous.get(dataflow)
+    if scheduler is None:
+        scheduler = _continuous[dataflow] = ContinuousEvaluation(dataflow)
+    node.continuous_eval.unregister_listener(old)
+    listener = _ContinuousEvalListener(scheduler, vid)
+    node.continuous_eval.register_listener(listener)
+    # CompositeNode.set_continuous_eval unregisters it and the observer
+    # only keeps a weak reference.
+    node.continuous_listener = listener
@@ -0,0 +1,295 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Parallel dataflow evaluators.
+
+These evaluators are registered in ``openalea.core.algo.dataflow_evaluation``
+so that they can be selected per workspace like the ones of openalea.core
+(``CompositeNode.eval_algo``). A vertex is scheduled as soon as all its
+parents are evaluated, so that independent branches run concurrently.
+
+This module does not depend on Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import abc
+import multiprocessing
+import os
+import pickle
+import weakref
+from concurrent import futures
+
+from openalea.core.algo import dataflow_evaluation as evalmodule
+from openalea.core.algo.dataflow_evaluation import AbstractEvaluation
+from openalea.core.node import FuncNode
+from openalea.visualea.resultcache import CachedFunction, get_result_cache
+
+
+def register_evaluator(name, cls):
+    """ Make cls selectable as the evaluation algorithm of composite nodes """
+    setattr(evalmodule, name, cls)
+    if name not in evalmodule.__evaluators__:
+        evalmodule.__evaluators__.append(name)
+
+
+class _Precomputed(object):
+    """ Stands for the function of a node whose result was computed elsewhere,
+    so that Node.eval still handles outputs and notifications """
+
+    def __init__(self, result=None, exception=None):
+        self.result = result
+        self.exception = exception
+
+    def __call__(self, *args):
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+
+class ConcurrentEvaluation(AbstractEvaluation, metaclass=abc.ABCMeta):
+    """ Evaluates the ready vertices of a dataflow concurrently.
+
+    Sub-classes decide in :meth:`submit` which vertices are run in an
+    executor. The others are evaluated in the calling thread while the
+    submitted ones are running.
+    """
+
+    def __init__(self, dataflow):
+        AbstractEvaluation.__init__(self, dataflow)
+        self._evaluated = set()
+
+    @abc.abstractmethod
+    def submit(self, vid, actor):
+        """ Return a future computing the result of actor, or None to evaluate
+        it in the calling thread """
+
+    @abc.abstractmethod
+    def collect(self, vid, actor, future):
+        """ Apply the result of a future returned by :meth:`submit` """
+
+    def set_inputs(self, vid):
+        """ Copy the outputs of the parents of vid to its inputs """
+        df = self._dataflow
+        actor = df.actor(vid)
+        for pid in df.in_ports(vid):
+            inputs = [nactor.get_output(df.local_id(npid))
+                      for npid, nvid, nactor in self.get_parent_nodes(pid)]
+            if len(inputs) == 1:
+                actor.set_input(df.local_id(pid), inputs[0])
+            elif inputs:
+                actor.set_input(df.local_id(pid), inputs)
+
+    def parents(self, vid):
+        df = self._dataflow
+        return set(nvid for pid in df.in_ports(vid)
+                   for npid, nvid, nactor in self.get_parent_nodes(pid))
+
+    def dependencies(self, vids):
+        """ Return the map vid -> parent vids of vids and of all their ancestors """
+        deps = {}
+        stack = list(vids)
+        while stack:
+            vid = stack.pop()
+            if vid in deps:
+                continue
+            deps[vid] = self.parents(vid)
+            stack.extend(deps[vid])
+        return deps
+
+    def eval(self, vtx_id=None, *args, **kwds):
+        df = self._dataflow
+        self._evaluated.clear()
+
+        if vtx_id is not None:
+            leaves = [vtx_id]
+        else:
+            leaves = [vid for vid in df.vertices() if df.nb_out_edges(vid) == 0]
+
+        deps = self.dependencies(leaves)
+        running = {}
+        try:
+            while deps or running:
+                ready = [vid for vid, parents in deps.items()
+                         if parents <= self._evaluated]
+                if not ready and not running:
+                    # cycle: break it on one of its vertices like BrutEvaluation
+                    ready = [min(deps)]
+                local = []
+                for vid in ready:
+                    del deps[vid]
+                    self.set_inputs(vid)
+                    future = self.submit(vid, df.actor(vid))
+                    if future is None:
+                        local.append(vid)
+                    else:
+                        running[future] = vid
+
+                for vid in local:
+                    self.eval_vertex_code(vid)
+                    self._evaluated.add(vid)
+
+                if local or not running:
+                    continue
+
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    vid = running.pop(future)
+                    self.collect(vid, df.actor(vid), future)
+                    self._evaluated.add(vid)
+        finally:
+            for future in running:
+                future.cancel()
+
+    def replay(self, vid, actor, result=None, exception=None):
+        """ Evaluate actor with result (or exception) in place of its function """
+        func = actor.func
+        actor.func = _Precomputed(result, exception)
+        try:
+            self.eval_vertex_code(vid)
+        finally:
+            actor.func = func
+
+    @staticmethod
+    def offloadable(actor):
+        """ Only function nodes that will actually compute can be run elsewhere """
+        return (isinstance(actor, FuncNode)
+                and type(actor).__call__ is FuncNode.__call__
+                and actor.func is not None
+                and not getattr(actor, "block", False)
+                and (actor.modified or not getattr(actor, "lazy", True)))
+
+
+######################
+# Process evaluation #
+######################
+_process_pool = None
+
+
+def get_process_pool():
+    """ Return the process pool shared by all the process pool evaluations """
+    global _process_pool
+    if _process_pool is None:
+        # fork is unsafe from a process running Qt threads.
+        context = multiprocessing.get_context("spawn")
+        _process_pool = futures.ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                                    mp_context=context)
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+        _process_pool = None
+
+
+def _call_pickled(payload):
+    """ Run in a worker process. Return (True, pickled result) or (False, None)
+    if the node or its result cannot be transferred """
+    try:
+        func, inputs = pickle.loads(payload)
+    except Exception:
+        return False, None
+    result = func(*inputs)
+    try:
+        return True, pickle.dumps(result)
+    except Exception:
+        return False, None
+
+
+class ProcessPoolEvaluation(ConcurrentEvaluation):
+    """ Runs independent function nodes in a pool of processes.
+
+    Nodes whose function or inputs cannot be pickled are evaluated in the GUI
+    process, like with BrutEvaluation.
+    """
+
+    def submit(self, vid, actor):
+        if not self.offloadable(actor):
+            return None
+        func = actor.func
+        if isinstance(func, CachedFunction):
+            key = func.lookup_key(actor.inputs)
+            if key is not None and key in get_result_cache():
+                # evaluated at once from the cache
+                return None
+            func = func.func
+        try:
+            payload = pickle.dumps((func, list(actor.inputs)))
+        except Exception:
+            return None
+        return get_process_pool().submit(_call_pickled, payload)
+
+    def collect(self, vid, actor, future):
+        try:
+            transferred, data = future.result()
+        except futures.process.BrokenProcessPool:
+            shutdown_process_pool()
+            transferred, data = False, None
+        except Exception as e:
+            self.replay(vid, actor, exception=e)
+            return
+
+        if transferred:
+            result = pickle.loads(data)
+            if isinstance(actor.func, CachedFunction):
+                actor.func.store(actor.inputs, result)
+            self.replay(vid, actor, result=result)
+        else:
+            self.eval_vertex_code(vid)
+
+
+#####################
+# Thread evaluation #
+#####################
+_thread_limits = weakref.WeakKeyDictionary()
+
+
+def get_thread_limit(dataflow):
+    """ Maximum number of vertices of dataflow evaluated at once """
+    return _thread_limits.get(dataflow, os.cpu_count() or 4)
+
+
+def set_thread_limit(dataflow, limit):
+    _thread_limits[dataflow] = max(1, int(limit))
+
+
+class ThreadPoolEvaluation(ConcurrentEvaluation):
+    """ Runs the ready vertices in a pool of threads.
+
+    Suited to nodes waiting for I/O or calling code that releases the GIL,
+    without the cost of pickling their inputs. The size of the pool is set
+    per workspace with :func:`set_thread_limit`.
+    """
+
+    def eval(self, vtx_id=None, *args, **kwds):
+        limit = get_thread_limit(self._dataflow)
+        with futures.ThreadPoolExecutor(max_workers=limit) as pool:
+            self.__pool = pool
+            try:
+                ConcurrentEvaluation.eval(self, vtx_id, *args, **kwds)
+            finally:
+                self.__pool = None
+
+    def submit(self, vid, actor):
+        return self.__pool.submit(self.eval_vertex_code, vid)
+
+    def collect(self, vid, actor, future):
+        # raises the EvaluationException of the vertex, if any
+        future.result()
+
+
+register_evaluator("ProcessPoolEvaluation", ProcessPoolEvaluation)
+register_evaluator("ThreadPoolEvaluation", ThreadPoolEvaluation)
@@ -0,0 +1,133 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Search index of the node factories shared by the search tab and the
+node chooser.
+
+The index is built in a worker thread the first time it is needed, then
+kept up to date incrementally when the packages change.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+from qtpy import QtCore
+
+from openalea.core.pkgmanager import PackageManager
+from openalea.visualea import searchindex
+
+
+class _IndexThread(QtCore.QThread):
+    """ Builds an index, or lists the changes to apply to index """
+
+    def __init__(self, pkgmanager, index=None, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self.pkgmanager = pkgmanager
+        self.index = index
+        self.built = None
+        self.changes = None
+        self.interrupted = False
+
+    def run(self):
+        try:
+            if self.index is None:
+                self.built = searchindex.build_factory_index(self.pkgmanager)
+            else:
+                self.changes = searchindex.factory_changes(self.index, self.pkgmanager)
+        except RuntimeError:
+            # the packages changed while they were listed
+            self.interrupted = True
+
+
+class FactorySearch(QtCore.QObject):
+    """ Ranked search of the factories of a package manager.
+
+    The index is only modified in the GUI thread: the factories are listed
+    in a worker thread, which builds the index or finds the changes to
+    apply to it.
+    """
+
+    # emitted when the index is built or updated: pending searches can run
+    ready = QtCore.Signal()
+
+    def __init__(self, pkgmanager, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.pkgmanager = pkgmanager
+        self.__index = None
+        self.__thread = None
+        self.__outdated = False
+
+    def is_ready(self):
+        return self.__index is not None
+
+    def start(self):
+        """ Build the index in the background, if it is not built yet """
+        if self.__index is None:
+            self.update()
+
+    def update(self):
+        """ Take the added and removed factories into account, in the
+        background """
+        if self.__thread is not None:
+            self.__outdated = True
+            return
+        self.__outdated = False
+        self.__thread = _IndexThread(self.pkgmanager, self.__index)
+        self.__thread.finished.connect(self.__on_listed)
+        self.__thread.start()
+
+    def __on_listed(self):
+        thread, self.__thread = self.__thread, None
+        if thread.built is not None:
+            self.__index = thread.built
+        elif thread.changes is not None and thread.index is self.__index:
+            searchindex.apply_factory_changes(self.__index, thread.changes)
+        thread.deleteLater()
+        if thread.interrupted or self.__outdated:
+            self.update()
+        if self.__index is not None:
+            self.ready.emit()
+
+    def set_package_manager(self, pkgmanager):
+        """ Search the factories of pkgmanager; the factories with the same
+        package and name are replaced in the index """
+        self.pkgmanager = pkgmanager
+        self.update()
+
+    def search(self, text, limit=None, accept=None):
+        """ Return the factories matching text, best first, or None if the
+        index is not built yet; ready is emitted once it is. """
+        if self.__index is None:
+            self.start()
+            return None
+        return self.__index.search(text, limit, accept)
+
+
+_search = None
+
+
+def get_factory_search():
+    global _search
+    if _search is None:
+        _search = FactorySearch(PackageManager())
+    return _search
+
+
+def ports_match(factory, nb_inputs=-1, nb_outputs=-1):
+    """ True if factory has nb_inputs inputs and nb_outputs outputs (negative
+    numbers match any count, as do factories whose ports are not known) """
+    for wanted, ports in ((nb_inputs, getattr(factory, "inputs", None)),
+                          (nb_outputs, getattr(factory, "outputs", None))):
+        if wanted >= 0 and ports is not None and len(ports) != wanted:
+            return False
+    return True
@@ -23,10 +23,11 @@ __revision__ = " $Id$ "
 from qtpy.QtCore import QDir, Qt
 from qtpy.QtSvg import QSvgGenerator
 from qtpy.QtWidgets import QMessageBox, QFileDialog, QInputDialog, QLineEdit
-from qtpy.QtGui import QPixmap, QPainter
+from qtpy.QtGui import QPainter
 from openalea.visualea.graph_operator.base import Base
 
-from openalea.visualea.util import open_dialog, exception_display, busy_cursor
+from openalea.visualea.util import open_dialog, exception_display
+from openalea.visualea.evaluation import get_evaluation_engine
 from openalea.visualea.dialogs import NewGraph, FactorySelector
 from openalea.visualea.dialogs import IOConfigDialog
 
@@ -34,17 +35,50 @@ from openalea.core.compositenode import CompositeNodeFactory
 from openalea.core.pkgmanager import PackageManager
 from openalea.core import export_app
 from openalea.core.algo import dataflow_evaluation as evalmodule
+from openalea.visualea import evaluators  # registers the parallel evaluators
 from .compositenode_inspector import InspectorView
 
 
 class DataflowOperators(Base):
 
-    @exception_display
-    @busy_cursor
     def graph_run(self):
         master = self.master
-        master.get_graph().eval_as_expression()
+        get_evaluation_engine().run(master.get_graph())
 
+    def graph_stop(self):
+        """ Cancel the evaluation of the workspace """
+        get_evaluation_engine().stop(self.master.get_graph())
+
+
+    def graph_set_thread_limit(self):
+        """ Set the number of vertices the thread pool evaluator runs at once """
+        master = self.master
+        widget = master.get_sensible_parent()
+        graph = master.get_graph()
+        limit, ok = QInputDialog.getInt(widget, "Evaluation threads",
+                                        "Maximum number of nodes evaluated at once:",
+                                        evaluators.get_thread_limit(graph), 1, 256)
+        if ok:
+            evaluators.set_thread_limit(graph, limit)
+
+    def graph_show_timings(self, val):
+        """ Toggle the execution timing overlay of the workspace """
+        from openalea.visualea.dataflowview import timing
+        timing.set_overlay_enabled(self.master.get_graph_scene(), bool(val))
+
+    def graph_clear_result_cache(self):
+        """ Forget the memoized results of all the nodes """
+        from openalea.visualea.resultcache import get_result_cache
+        get_result_cache().clear()
+
+    def graph_show_slowest_nodes(self):
+        """ Open the table of the execution timings of the workspace """
+        from openalea.visualea.dataflowview import timing
+        master = self.master
+        dialog = timing.SlowestNodesDialog(master.get_graph_scene(),
+                                           master.get_sensible_parent())
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
 
     def graph_reset(self):
         master = self.master
@@ -345,23 +379,16 @@ class DataflowOperators(Base):
         filename = str(filename)
         if not filename:
             return
-        elif '.' not in filename:
-            filename += '.png'
 
-        mg = 10
-        scene.update()
-        source  = scene.itemsBoundingRect()
-        canvas  = scene.itemsBoundingRect().adjusted(-mg, -mg, mg, mg)
-        target  = scene.itemsBoundingRect()
-        pixmap  = QPixmap(canvas.width(), canvas.height())
-        painter = QPainter(pixmap)
-
-        target.moveTo(mg, mg)
-        pixmap.fill()
-        painter.setRenderHint(QPainter.Antialiasing)
-        scene.render(painter, target, source)
-        painter.end()
-        pixmap.save(filename)
+        # the image is rendered by tiles, so that posters of any size can
+        # be made without allocating the whole image.
+        from openalea.visualea.dataflowview import export
+        filename = export.png_filename(filename)
+        dpi, ok = QInputDialog.getInt(widget, "Export png image", "Resolution (dpi):",
+                                      int(export.SCREEN_DPI), 10, 2400)
+        if not ok:
+            return
+        export.export_png(scene, filename, scale=dpi / export.SCREEN_DPI)
 
     def graph_export_svg(self):
         """ Export current workspace to an image """
@@ -384,6 +411,8 @@ class DataflowOperators(Base):
             filename += '.png'
 
         mg = 10
+        from openalea.visualea.dataflowview.vertex import flush_geometry
+        flush_geometry(scene)
         scene.update()
         source  = scene.itemsBoundingRect()
         canvas  = scene.itemsBoundingRect().adjusted(-mg, -mg, mg, mg)
@@ -18,7 +18,9 @@
 __license__ = "Cecill-C"
 __revision__ = " $Id$ "
 
+from qtpy import QtCore, QtWidgets
 from openalea.visualea.graph_operator.base import Base
+from openalea.visualea.dataflowview.positions import move_items
 from functools import cmp_to_key
 
 def cmp(x, y):
@@ -29,8 +31,106 @@ def cmp(x, y):
     """
     return (x > y) - (x < y)
 
+class LayoutThread(QtCore.QThread):
+    """ Computes a layered layout off the GUI thread """
+
+    def __init__(self, layout, widths, heights, edges, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self.layout = layout
+        self.widths, self.heights, self.edges = widths, heights, edges
+        self.result = None
+        self.exception = None
+
+    def run(self):
+        try:
+            self.result = self.layout(self.widths, self.heights, self.edges)
+        except Exception as e:
+            self.exception = e
+
+
+class _LayoutJob(QtCore.QObject):
+    """ Created in the GUI thread, where it calls apply(thread) once the
+    layout of thread is computed """
+
+    def __init__(self, thread, apply):
+        QtCore.QObject.__init__(self)
+        self.layoutThread = thread
+        self.apply = apply
+        thread.finished.connect(self.on_finished, QtCore.Qt.QueuedConnection)
+
+    @QtCore.Slot()
+    def on_finished(self):
+        _layoutJobs.discard(self)
+        self.apply(self.layoutThread)
+        self.layoutThread.deleteLater()
+
+    def start(self):
+        _layoutJobs.add(self)
+        self.layoutThread.start()
+
+
+# layouts being computed, kept alive until they are applied
+_layoutJobs = set()
+
+
 class LayoutOperators(Base):
 
+    def graph_auto_layout(self):
+        """Lay out all the vertices by layers, from inputs to outputs."""
+        self.__auto_layout(selectionOnly=False)
+
+    def graph_auto_layout_selection(self):
+        """Lay out the selected vertices by layers, from inputs to outputs."""
+        self.__auto_layout(selectionOnly=True)
+
+    def __auto_layout(self, selectionOnly):
+        master = self.master
+        scene = master.get_graph_scene()
+        graph = master.get_graph()
+        if scene is None or graph is None:
+            return
+        try:
+            from openalea.visualea import autolayout
+        except ImportError:
+            QtWidgets.QMessageBox.warning(master.get_sensible_parent(), "Auto layout",
+                                          "Automatic layout requires NumPy.")
+            return
+
+        if selectionOnly:
+            items = scene.get_selected_items(master.vertexType)
+        else:
+            items = scene.get_items(filterType=master.vertexType)
+        if len(items) < 2:
+            return
+
+        # the layout keeps the top left corner of the vertices in place
+        positions = [item.get_view_data("position") for item in items]
+        origin = [min(pos[0] for pos in positions), min(pos[1] for pos in positions)]
+        index = dict((id(item.vertex()), i) for i, item in enumerate(items))
+        edges = []
+        for eid in graph.edges():
+            src = index.get(id(graph.node(graph.source(eid))))
+            dst = index.get(id(graph.node(graph.target(eid))))
+            if src is not None and dst is not None:
+                edges.append((src, dst))
+        from openalea.visualea.dataflowview.vertex import flush_geometry
+        flush_geometry(scene)
+        rects = [item.boundingRect() for item in items]
+
+        thread = LayoutThread(autolayout.layered_layout, [r.width() for r in rects], [r.height() for r in rects], edges)
+        parent = master.get_sensible_parent()
+
+        def apply(thread):
+            if thread.exception is not None:
+                QtWidgets.QMessageBox.warning(parent, "Auto layout", str(thread.exception))
+                return
+            moves = [(item, [origin[0] + x, origin[1] + y])
+                     for item, (x, y) in zip(items, thread.result.tolist())
+                     if item.scene() is scene]
+            move_items(scene, moves)
+
+        _LayoutJob(thread, apply).start()
+
     def graph_align_selection_horizontal(self):
         """Align all items on a median ligne"""
         master = self.master
@@ -46,10 +146,7 @@ class LayoutOperators(Base):
             ymean = sum(pos[1] for item, pos in items) / count
 
             #move all items
-            for item, pos in items :
-                item.store_view_data(position=[pos[0], ymean])
-            #notify
-            scene.notify(None,("graph_modified",) )
+            move_items(scene, ((item, [pos[0], ymean]) for item, pos in items))
 
         return
 
@@ -68,10 +165,7 @@ class LayoutOperators(Base):
             xmean = sum(pos[0] for item, pos in items) / count
 
             #move all items
-            for item, pos in items :
-                item.store_view_data(position=[xmean, pos[1]])
-            #notify
-            scene.notify(None,("graph_modified",) )
+            move_items(scene, ((item, [xmean, pos[1]]) for item, pos in items))
 
         return
 
@@ -92,11 +186,7 @@ class LayoutOperators(Base):
             xmean = sum(pos[0] + width for item, pos, width in items) / count
 
             #move all items
-            for item, pos, width in items :
-                item.store_view_data(position=[xmean - width, pos[1]])
-
-            #notify
-            scene.notify(None,("graph_modified",) )
+            move_items(scene, ((item, [xmean - width, pos[1]]) for item, pos, width in items))
 
         return
 
@@ -117,10 +207,7 @@ class LayoutOperators(Base):
             xmean = sum(pos[0] + width/2. for item, pos, width in items) / count
 
             #move all items
-            for item, pos, width in items :
-                item.store_view_data(position=[xmean - width/2., pos[1]])
-            #notify
-            scene.notify(None,("graph_modified",) )
+            move_items(scene, ((item, [xmean - width/2., pos[1]]) for item, pos, width in items))
 
         return
 
@@ -152,11 +239,11 @@ class LayoutOperators(Base):
             item, pos, width = items[0]
             current_x = pos[0] + width
 
+            moves = []
             for item, pos, width in items[1:-1] :
-                item.store_view_data(position=[current_x + dist, pos[1]])
+                moves.append((item, [current_x + dist, pos[1]]))
                 current_x += dist + width
-            #notify
-            scene.notify(None,("graph_modified",) )
+            move_items(scene, moves)
 
         return
 
@@ -187,11 +274,10 @@ class LayoutOperators(Base):
             item, pos, height = items[0]
             current_y = pos[1] + height
 
+            moves = []
             for item, pos, height in items[1:-1] :
-                item.store_view_data(position=[pos[0], current_y + dist])
+                moves.append((item, [pos[0], current_y + dist]))
                 current_y += dist + height
-
-            #notify
-            scene.notify(None,("graph_modified",) )
+            move_items(scene, moves)
 
         return
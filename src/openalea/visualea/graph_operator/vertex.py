@@ -24,6 +24,8 @@ from openalea.visualea.graph_operator.base import Base
 from openalea.visualea.graph_operator import compositenode_inspector
 
 from openalea.visualea.util import busy_cursor, exception_display, open_dialog
+from openalea.visualea.evaluation import get_evaluation_engine, install_continuous_evaluation
+from openalea.visualea import resultcache
 from openalea.visualea.dialogs import DictEditor, ShowPortDialog, NodeChooser
 
 from openalea.core.compositenode import CompositeNode
@@ -59,6 +61,8 @@ class VertexOperators(Base):
             ###################################
             # -- Let's fix the window size -- #
             ###################################
+            from openalea.visualea.dataflowview.vertex import flush_geometry
+            flush_geometry(widget.scene())
             scRectF = widget.scene().itemsBoundingRect()
             tl = scRectF.topLeft()
             # -- check the rect doesn't have crazy negative values or too close to screen edge
@@ -83,11 +87,10 @@ class VertexOperators(Base):
 #            widget.show_entire_scene()
             widget.show()
 
-    @exception_display
-    @busy_cursor
     def vertex_run(self):
         master = self.master
-        master.get_graph().eval_as_expression(master.get_vertex_item().vertex().get_id())
+        get_evaluation_engine().run(master.get_graph(),
+                                    master.get_vertex_item().vertex().get_id())
 
     def vertex_open(self):
         master = self.master
@@ -195,8 +198,10 @@ class VertexOperators(Base):
 
     def vertex_mark_user_app(self, val):
         master = self.master
-        master.get_graph().set_continuous_eval(master.get_vertex_item().vertex().get_id(),
-                                               bool(val))
+        vid = master.get_vertex_item().vertex().get_id()
+        master.get_graph().set_continuous_eval(vid, bool(val))
+        if val:
+            install_continuous_evaluation(master.get_graph(), vid)
 
     def vertex_set_lazy(self, val):
         self.master.get_vertex_item().vertex().lazy = val
@@ -204,6 +209,10 @@ class VertexOperators(Base):
     def vertex_block(self, val):
         self.master.get_vertex_item().vertex().block = val
 
+    def vertex_cache_results(self, val):
+        """ Toggle the memoization of the results of the vertex """
+        resultcache.set_cache_enabled(self.master.get_vertex_item().vertex(), bool(val))
+
     def vertex_edit_internals(self):
         """ Edit node internal data """
         master = self.master
@@ -34,7 +34,7 @@ from openalea.core.algo.dataflow_evaluation import AbstractEvaluation
 from openalea.core.compositenode import CompositeNodeFactory
 from openalea.core.node import NodeFactory
 from openalea.core.pkgmanager import PackageManager
-from openalea.core.settings import NoOptionError, NoSectionError, Settings
+from openalea.core.settings import Settings
 
 from openalea.oalab.shell import get_shell_class
 
@@ -43,6 +43,11 @@ dest = get_data("openalea.visualea.mainwindow", "ui_mainwindow.py")
 generate_pyfile_from_uifile(__name__, src=src, dest=dest)
 
 from openalea.visualea import dataflowview, helpwidget, metainfo, ui_mainwindow
+from openalea.visualea.evaluation import get_evaluation_engine
+from openalea.visualea.evaluators import shutdown_process_pool
+from openalea.visualea.factorysearch import get_factory_search
+from openalea.visualea.pkgcache import LoadingPackageManager, PackageRecorder, load_cached_manager
+from openalea.visualea.uisettings import get_ui_settings, invalidate_ui_settings
 from openalea.visualea.dialogs import NewData, NewGraph, NewPackage, PreferencesDialog
 from openalea.visualea.graph_operator import GraphOperator
 from openalea.visualea.graph_operator.vertex import VertexOperators
@@ -60,6 +65,10 @@ from openalea.visualea.node_treeview import (
 from openalea.visualea.node_widget import SignalSlotListener
 
 PROVENANCE = False
+# number of results shown by the search tab
+SEARCH_LIMIT = 200
+# interval (ms) between two updates of the trees while the packages load
+LOADING_INTERVAL = 300
 
 
 class MainWindow(
@@ -115,6 +124,39 @@ class MainWindow(
         self.searchListView.setModel(self.search_model)
         self.vboxlayout3.addWidget(self.searchListView)
         self.searchListView.clicked.connect(self.on_package_manager_focus_change)
+        # the searches typed before the index is built run when it is ready
+        self.factory_search = get_factory_search()
+        self.factory_search.ready.connect(self.search_node)
+
+        # package and category trees, served from the metadata cache until
+        # the session has loaded the packages
+        self.session = None
+        self.pkgcache, cachedPackages = load_cached_manager()
+        self.__cachedPackages = cachedPackages
+        self.factory_search.set_package_manager(cachedPackages)
+
+        # package tree view
+        self.pkg_model = PkgModel(cachedPackages)
+        self.packageTreeView = NodeFactoryTreeView(self, self.packageview)
+        self.packageTreeView.setModel(self.pkg_model)
+        self.vboxlayout1.addWidget(self.packageTreeView)
+        self.packageTreeView.clicked.connect(self.on_package_manager_focus_change)
+
+        # category tree view
+        self.cat_model = CategoryModel(cachedPackages)
+        self.categoryTreeView = NodeFactoryTreeView(self, self.categoryview)
+        self.categoryTreeView.setModel(self.cat_model)
+        self.vboxlayout2.addWidget(self.categoryTreeView)
+        self.categoryTreeView.clicked.connect(self.on_package_manager_focus_change)
+
+        # progress of the packages loading, see start_loading
+        self.loadingLabel = QtWidgets.QLabel()
+        self.__recorder = None
+        self.__loadedPackages = {}
+        self.__loadingSignature = None
+        self.__loadingTimer = QtCore.QTimer(self)
+        self.__loadingTimer.setInterval(LOADING_INTERVAL)
+        self.__loadingTimer.timeout.connect(self.__update_loading)
 
         # help widget
         self.helpWidget = helpwidget.HelpWidget()
@@ -134,7 +176,7 @@ class MainWindow(
         #                                          self.contextMenuEvent)  # F. Bauget 2023-01-18
         self.tabWorkspace.customContextMenuRequested.connect(self.contextMenuEvent)
         self.tabWorkspace.currentChanged.connect(self.ws_changed)
-        self.search_lineEdit.editingFinished.connect(self.search_node)
+        self.search_lineEdit.textChanged.connect(self.search_node)
         self.tabWorkspace.tabCloseRequested.connect(self.close_tab_workspace)
 
         # Help Menu
@@ -173,6 +215,7 @@ class MainWindow(
         self.__operatorAction = dict(
             [
                 (self.action_Run, "graph_run"),
+                (self.action_Stop, "graph_stop"),
                 (self.actionInvalidate, "graph_invalidate"),
                 (self.actionReset, "graph_reset"),
                 (self.actionConfigure_I_O, "graph_configure_io"),
@@ -198,6 +241,8 @@ class MainWindow(
                     self.actionDistributeVertically,
                     "graph_distribute_selection_vertically",
                 ),
+                (self.actionAutoLayout, "graph_auto_layout"),
+                (self.actionAutoLayoutSelection, "graph_auto_layout_selection"),
                 (self.actionSetCustomColor, "graph_set_selection_color"),
                 (self.actionUseCustomColor, "graph_use_user_color"),
             ]
@@ -214,6 +259,11 @@ class MainWindow(
 
         self.actionTo_script.triggered.connect(self.to_python_script)
 
+        # Evaluation state
+        engine = get_evaluation_engine()
+        engine.evaluationStarted.connect(self.update_evaluation_actions)
+        engine.evaluationFinished.connect(self.update_evaluation_actions)
+
         # Window Menu
         self.actionPreferences.triggered.connect(self.open_preferences)
         self.actionDisplay_Package_Manager.toggled.connect(self.display_leftpanel)
@@ -309,7 +359,56 @@ class MainWindow(
 
             search_trace(cn, pkg, wk, parent=self)
 
+    def start_loading(self, pkgmanager):
+        """The session is being started in another thread: the shell, the
+        trees and the search stay usable, the packages appear in the trees as
+        they are loaded, and the workspaces are enabled once it is ready.
+
+        pkgmanager is the package manager the session fills; it must be
+        created, and this method called, before the thread is started. It is
+        not read until the session is ready: the packages registered are
+        recorded by a PackageRecorder."""
+        self.__recorder = PackageRecorder(pkgmanager)
+        self.menubar.setEnabled(False)
+        self.tabWorkspace.setEnabled(False)
+        self.statusBar().addPermanentWidget(self.loadingLabel)
+        self.loadingLabel.show()
+        self.__update_loading()
+        self.__loadingTimer.start()
+
+    def __update_loading(self):
+        for pkg in self.__recorder.take():
+            self.__loadedPackages[pkg.name] = pkg
+        packages = LoadingPackageManager(self.__cachedPackages, self.__loadedPackages)
+        if packages.expected:
+            text = "Loading packages: %d/%d" % (packages.loaded, packages.expected)
+        else:
+            text = "Loading packages: %d" % packages.loaded
+        self.loadingLabel.setText(text)
+
+        signature = packages.signature()
+        if signature == self.__loadingSignature:
+            return
+        for model in (self.pkg_model, self.cat_model):
+            model.pman = packages
+            model.refresh()
+        self.__loadingSignature = signature
+        self.factory_search.set_package_manager(packages)
+        self.search_node()
+
+    def __stop_loading(self):
+        self.__loadingTimer.stop()
+        if self.__recorder is not None:
+            self.__recorder.stop()
+            self.__recorder = None
+        self.__loadedPackages = {}
+        if self.loadingLabel.isVisible():
+            self.statusBar().removeWidget(self.loadingLabel)
+        self.menubar.setEnabled(True)
+        self.tabWorkspace.setEnabled(True)
+
     def on_session_started(self, session):
+        self.__stop_loading()
         self.initialise(session)
         self.session = session
 
@@ -322,19 +421,13 @@ class MainWindow(
         self.pkgmanager = session.pkgmanager
         self.actionShow_log.triggered.connect(self.pkgmanager.log.print_log)
 
-        # package tree view
-        self.pkg_model = PkgModel(self.pkgmanager)
-        self.packageTreeView = NodeFactoryTreeView(self, self.packageview)
-        self.packageTreeView.setModel(self.pkg_model)
-        self.vboxlayout1.addWidget(self.packageTreeView)
-        self.packageTreeView.clicked.connect(self.on_package_manager_focus_change)
-
-        # category tree view
-        self.cat_model = CategoryModel(self.pkgmanager)
-        self.categoryTreeView = NodeFactoryTreeView(self, self.categoryview)
-        self.categoryTreeView.setModel(self.cat_model)
-        self.vboxlayout2.addWidget(self.categoryTreeView)
-        self.categoryTreeView.clicked.connect(self.on_package_manager_focus_change)
+        # the trees and the search switch from the cached packages to the
+        # real ones
+        for model in (self.pkg_model, self.cat_model):
+            model.pman = self.pkgmanager
+            model.refresh()
+        self.factory_search.set_package_manager(self.pkgmanager)
+        self.search_node()
 
         # data pool list view
         self.datapool_model = DataPoolModel(session.datapool)
@@ -378,61 +471,31 @@ class MainWindow(
         settings.set("Provenance", "enable", str(prov))
 
         settings.write()
+        invalidate_ui_settings()
 
     def read_settings(self):
         """Read application settings."""
-        settings = Settings()
+        settings = get_ui_settings()
 
         # main window
-        try:
-            size = eval(settings.get("MainWindow", "size"))
-            self.resize(QtCore.QSize(*size))
-        except NoSectionError:
-            pass
-        except NoOptionError:
-            pass
-        try:
-            pos = eval(settings.get("MainWindow", "pos"))
-            self.move(QtCore.QPoint(*pos))
-        except NoSectionError:
-            pass
-        except NoOptionError:
-            pass
-        try:
-            sizes = eval(settings.get("MainWindow", "splitter_2"))
-            self.splitter_2.setSizes(sizes)
-        except NoSectionError:
-            pass
-        except NoOptionError:
-            pass
-        try:
-            sizes = eval(settings.get("MainWindow", "splitter_3"))
-            self.splitter_3.setSizes(sizes)
-        except NoSectionError:
-            pass
-        except NoOptionError:
-            pass
+        if settings.main_window_size is not None:
+            self.resize(QtCore.QSize(*settings.main_window_size))
+        if settings.main_window_pos is not None:
+            self.move(QtCore.QPoint(*settings.main_window_pos))
+        if settings.splitter_2 is not None:
+            self.splitter_2.setSizes(settings.splitter_2)
+        if settings.splitter_3 is not None:
+            self.splitter_3.setSizes(settings.splitter_3)
+
         # workspace
-        try:
-            last_open = eval(settings.get("WorkSpace", "last"))
-            last_open.reverse()
-            for item in last_open:
-                gr = item.split(".")
-                pkgid = ".".join(gr[:-1])
-                name = gr[-1]
-                self.add_last_open(pkgid, name)
-        except NoSectionError:
-            pass
-        except NoOptionError:
-            pass
+        for item in reversed(settings.last_open):
+            gr = item.split(".")
+            pkgid = ".".join(gr[:-1])
+            name = gr[-1]
+            self.add_last_open(pkgid, name)
 
-        try:
-            prov = eval(settings.get("Provenance", "enable"))
-            self.set_provenance(bool(prov))
-        except NoSectionError:
-            pass
-        except NoOptionError:
-            pass
+        if settings.provenance is not None:
+            self.set_provenance(bool(settings.provenance))
 
     def redo_last_open_menu(self):
         """Create entries for last opened nodes."""
@@ -565,6 +628,8 @@ class MainWindow(
                 return
             if event[0] == "graphoperator_graphsaved":
                 self.reinit_treeview()
+                self.pkg_model.item_changed(event[2])
+                self.cat_model.item_changed(event[2])
                 caption = "Workspace %i - %s" % (index, event[2].name)
                 self.tabWorkspace.setTabText(index, caption)
             elif event[0] == "graphoperator_graphclosed":
@@ -586,6 +651,12 @@ class MainWindow(
         # Save personal settings
         self.write_settings()
 
+        # running evaluations must end before their workspaces are closed
+        engine = get_evaluation_engine()
+        engine.stop()
+        engine.wait()
+        shutdown_process_pool()
+
         # close windows
         for i in range(self.tabWorkspace.count()):
             w = self.tabWorkspace.widget(i)
@@ -594,11 +665,12 @@ class MainWindow(
         event.accept()
 
     def reinit_treeview(self):
-        """Reinitialise package and category views"""
-        self.cat_model.reset()
-        self.pkg_model.reset()
+        """Update package and category views"""
+        self.cat_model.refresh()
+        self.pkg_model.refresh()
         self.datapool_model.reset()
-        self.search_model.reset()
+        self.factory_search.update()
+        self.search_node()
 
     def close_tab_workspace(self, cindex):
         """Close workspace indexed by cindex cindex is Node"""
@@ -693,6 +765,15 @@ class MainWindow(
     def ws_changed(self, index):
         """Current workspace has changed"""
         self.session.cworkspace = index
+        self.update_evaluation_actions()
+
+    def update_evaluation_actions(self, node=None):
+        """Enable the Stop action if the current workspace is being evaluated"""
+        graphview = self.tabWorkspace.currentWidget()
+        running = False
+        if isinstance(graphview, dataflowview.DataflowView):
+            running = get_evaluation_engine().is_running(graphview.scene().get_graph())
+        self.action_Stop.setEnabled(running)
 
     def contextMenuEvent(self, event):
         """Context menu event : Display the menu"""
@@ -859,13 +940,16 @@ class MainWindow(
 
         self.session.datapool.clear()
 
-    def search_node(self):
-        """Activated when search line edit is validated"""
+    def search_node(self, *args):
+        """Activated when the text of the search line edit changes"""
 
-        # text = str(str(self.search_lineEdit.text()).encode('latin1')) # don't get why this encode()
-        text = self.search_lineEdit.text()
-        results = self.pkgmanager.search_node(text)
-        self.search_model.set_results(results)
+        text = self.search_lineEdit.text().strip()
+        if not text:
+            self.search_model.set_results([])
+            return
+        results = self.factory_search.search(text, SEARCH_LIMIT)
+        if results is not None:
+            self.search_model.set_results(results)
 
     def find_node(self):
         """Find node Command"""
@@ -885,7 +969,7 @@ class MainWindow(
     # Drag and drop support
     def dragEnterEvent(self, event):
         """todo"""
-        if event.mimeData().hasUrls():
+        if event.mimeData().hasUrls() and self.session is not None:
             event.accept()
         else:
             event.ignore()
@@ -911,6 +995,9 @@ class MainWindow(
         self.helpWidget.set_rst(item.vertex().get_tip())
 
     def on_package_manager_focus_change(self, item):
+        if self.session is None:
+            # the factories shown may only be read from the package cache
+            return
         pkg_id, factory_id, mimetype = NodeFactoryView.get_item_info(item)
         if (
             len(pkg_id)
@@ -954,24 +1041,16 @@ class MainWindow(
         filename = str(filename)
         if not filename:
             return
-        elif "." not in filename:
-            filename += ".png"
+        filename = dataflowview.export.png_filename(filename)
 
         # Get current workspace
         view = self.tabWorkspace.currentWidget()
-        # Retrieve the user layout
-        rect = view.scene().sceneRect()
-        matrix = view.transform()
-        rect = matrix.mapRect(rect)
-
-        pixmap = QtGui.QPixmap(rect.width(), rect.height())
-        pixmap.fill()
-        painter = QtGui.QPainter(pixmap)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing)
-        view.update()
-        view.scene().render(painter)
-        painter.end()
-        pixmap.save(filename)
+        # Retrieve the user layout: the scene at the zoom of the view,
+        # rendered by tiles.
+        scene = view.scene()
+        dataflowview.vertex.flush_geometry(scene)
+        dataflowview.export.export_png(scene, filename, source=scene.sceneRect(),
+                                       scale=view.transform().m11(), margin=0)
 
     def export_image_svg(self):
         """Export current workspace to an image"""
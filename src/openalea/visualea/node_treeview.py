@@ -45,6 +45,8 @@ from openalea.visualea.util import open_dialog, exception_display, busy_cursor
 from openalea.visualea.node_widget import SignalSlotListener
 from openalea.visualea.code_editor import get_editor
 from openalea.visualea.util import grab_icon
+from openalea.visualea.rowdiff import row_changes
+from openalea.visualea.pkgcache import CachedFactory, factory_type, is_factory
 
 from openalea.visualea import images_rc
 
@@ -53,12 +55,6 @@ from openalea.visualea import images_rc
 
 icon_dict = None
 
-# pradal
-from functools import cmp_to_key
-
-def cmp(a, b):
-    return (a > b) - (a < b) 
-
 def get_icon(item):
     """ Return Icon object depending of the type of item """
 
@@ -91,12 +87,39 @@ def get_icon(item):
                     return pix
 
             # Standard icon
-            return icon_dict[type(item.item)]
+            return _type_icon(type(item.item))
 
         return QtGui.QPixmap(":/icons/pseudopkg.png")
 
     else:
-        return None
+        # subclasses, and the factories read from the package cache
+        return _type_icon(factory_type(item))
+
+
+def _type_icon(t):
+    for base in t.__mro__:
+        if base in icon_dict:
+            return icon_dict[base]
+    return None
+
+
+def merge_pseudo_tree(old, new):
+    """ Update the pseudo package tree old in place so that it matches new,
+    keeping the groups of old that still exist. Return False if the trees
+    are not dictionaries of names and can not be merged. """
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        return False
+    old.__dict__.update(new.__dict__)
+    for key in [k for k in old if k not in new]:
+        del old[key]
+    for key, value in new.items():
+        current = old.get(key)
+        if (isinstance(current, PseudoGroup) and type(current) is type(value) and
+                merge_pseudo_tree(current, value)):
+            continue
+        if current is not value:
+            old[key] = value
+    return True
 
 
 # Qt4 Models/View classes
@@ -107,20 +130,26 @@ for i, types in enumerate(type_hierarchy):
         type_order_map[t] = i
 
 
-def item_compare(x, y):
-    if type(x) == type(y):
-        return cmp(x.get_id(), y.get_id())
-    else:
-        tx, ty = type(x), type(y)
-        for t in type_order_map:
-            if isinstance(x, t):
-                tx = t
-                break
-        for t in type_order_map:
-            if isinstance(y, t):
-                ty = t
+_type_rank = {}
+
+
+def type_rank(t):
+    """ Position of the type t in type_hierarchy, looked up once per type """
+    rank = _type_rank.get(t)
+    if rank is None:
+        rank = len(type_hierarchy)
+        for base in t.__mro__:
+            if base in type_order_map:
+                rank = type_order_map[base]
                 break
-        return cmp(type_order_map[tx], type_order_map[ty])
+        _type_rank[t] = rank
+    return rank
+
+
+def item_sort_key(item):
+    """ Packages and categories first, then composite nodes, nodes and data,
+    each group by name """
+    return type_rank(factory_type(item)), item.get_id()
 
 
 class PkgModel (QtCore.QAbstractItemModel):
@@ -136,13 +165,105 @@ class PkgModel (QtCore.QAbstractItemModel):
         self.parent_map = {}
         self.row_map = {}
         self.index_map = {} # map between name and Index object
+        self.children_map = {} # id of item -> (item, sorted children)
+        self.shown_counts = {} # id of item -> number of values displayed
+
+    def root_item(self):
+        return self.pman.get_pseudo_pkg()
 
     def reset(self):
 
-        self.rootItem = self.pman.get_pseudo_pkg()
+        self.rootItem = self.root_item()
         QtCore.QAbstractItemModel.beginResetModel(self)
+        self.clear_children()
         QtCore.QAbstractItemModel.endResetModel(self)
 
+    def clear_children(self):
+        """ Forget the sorted children, the package tree has changed """
+        self.children_map.clear()
+        self.parent_map.clear()
+        self.row_map.clear()
+        self.shown_counts.clear()
+
+    def refresh(self):
+        """ Bring the model up to date with the package manager by inserting
+        and removing rows, so that the views keep their expanded items and
+        scroll position. Only the items already shown are compared. """
+        if not merge_pseudo_tree(self.rootItem, self.root_item()):
+            self.reset()
+            return
+        self.__update_children(QtCore.QModelIndex(), self.rootItem)
+
+    def item_changed(self, item):
+        """ The data of item (a factory that was saved...) has changed """
+        parentItem = self.parent_map.get(id(item))
+        entry = self.children_map.get(id(parentItem))
+        row = self.row_map.get(id(item))
+        if entry is None or row is None or row >= len(entry[1]) or entry[1][row] is not item:
+            return
+        index = self.createIndex(row, 0, item)
+        self.dataChanged.emit(index, index)
+
+    def __forget(self, item):
+        entry = self.children_map.pop(id(item), None)
+        self.parent_map.pop(id(item), None)
+        self.row_map.pop(id(item), None)
+        self.shown_counts.pop(id(item), None)
+        if entry is not None:
+            for child in entry[1]:
+                self.__forget(child)
+
+    def __update_children(self, parentIndex, parentItem):
+        entry = self.children_map.get(id(parentItem))
+        if entry is None or entry[0] is not parentItem:
+            # never shown, will be listed when needed
+            return
+        rows = entry[1]
+        new = sorted(parentItem.iter_public_values(), key=item_sort_key)
+        changes = row_changes(rows, new)
+        if changes is None:
+            # some rows changed places (renamed items): replace them all
+            changes = [("remove", 0, len(rows) - 1)] if rows else []
+            if new:
+                changes.append(("insert", 0, new))
+
+        for change in changes:
+            if change[0] == "remove":
+                first, last = change[1], change[2]
+                self.beginRemoveRows(parentIndex, first, last)
+                for child in rows[first:last + 1]:
+                    self.__forget(child)
+                del rows[first:last + 1]
+                self.endRemoveRows()
+            else:
+                first, items = change[1], change[2]
+                self.beginInsertRows(parentIndex, first, first + len(items) - 1)
+                rows[first:first] = items
+                self.endInsertRows()
+
+        for row, childItem in enumerate(rows):
+            self.parent_map[id(childItem)] = parentItem
+            self.row_map[id(childItem)] = row
+            if is_factory(childItem):
+                continue
+            index = self.createIndex(row, 0, childItem)
+            shown = self.shown_counts.get(id(childItem))
+            if shown is not None and shown != childItem.nb_public_values():
+                self.dataChanged.emit(index, index)
+            self.__update_children(index, childItem)
+
+    def children(self, parentItem):
+        """ Sorted public values of parentItem, computed once per reset """
+        entry = self.children_map.get(id(parentItem))
+        if entry is not None and entry[0] is parentItem:
+            return entry[1]
+        l = sorted(parentItem.iter_public_values(), key=item_sort_key)
+        self.children_map[id(parentItem)] = (parentItem, l)
+        for row, childItem in enumerate(l):
+            self.parent_map[id(childItem)] = parentItem
+            self.row_map[id(childItem)] = row
+        return l
+
     def columnCount(self, parent):
         return 1
 
@@ -160,6 +281,7 @@ class PkgModel (QtCore.QAbstractItemModel):
             lenstr = ''
             try:
                 l = item.nb_public_values()
+                self.shown_counts[id(item)] = l
                 if(l):
                     lenstr = " ( %i )" % (l,)
             except:
@@ -209,14 +331,7 @@ class PkgModel (QtCore.QAbstractItemModel):
         else:
             parentItem = parent.internalPointer()
 
-        l = list(parentItem.iter_public_values())
-     # F. Bauget 2023-01-18    
-        l.sort(key=cmp_to_key(item_compare)) 
-        childItem = l[row]
-
-        # save parent and row
-        self.parent_map[id(childItem)] = parentItem
-        self.row_map[id(childItem)] = row
+        childItem = self.children(parentItem)[row]
 
         i = self.createIndex(row, column, childItem)
 
@@ -250,13 +365,11 @@ class PkgModel (QtCore.QAbstractItemModel):
         else:
             parentItem = parent.internalPointer()
 
-        if isinstance(parentItem, AbstractFactory):
+        if is_factory(parentItem):
             return 0
 
         # Return the number of DIFFERENT OBJECTS
-        l = parentItem.nb_public_values()
-
-        return l
+        return len(self.children(parentItem))
 
 
 class CategoryModel (PkgModel):
@@ -272,13 +385,11 @@ class CategoryModel (PkgModel):
         self.parent_map = {}
         self.row_map = {}
         self.index_map = {}
+        self.children_map = {}
+        self.shown_counts = {}
 
-    def reset(self):
-        self.rootItem = self.pman.get_pseudo_cat()
-        # self.parent_map = {}
-        # self.row_map = {}
-        QtCore.QAbstractItemModel.beginResetModel(self)
-        QtCore.QAbstractItemModel.endResetModel(self)
+    def root_item(self):
+        return self.pman.get_pseudo_cat()
 
 
 class DataPoolModel (QtCore.QAbstractListModel):
@@ -532,11 +643,25 @@ class NodeFactoryView(object):
 
         return ("0", "0", "openalea/notype")
 
+    def session_ready(self):
+        """ False while the packages are loaded in the background: the
+        factories shown may not be loaded yet """
+        return self.main_win is None or self.main_win().session is not None
+
+    def current_object(self):
+        """ The current item; a factory read from the package cache is
+        replaced by the real factory """
+        obj = self.currentIndex().internalPointer()
+        if isinstance(obj, CachedFactory):
+            obj = obj.resolve()
+        return obj
+
     def contextMenuEvent(self, event):
         """ Context menu event : Display the menu"""
+        if not self.session_ready():
+            return
 
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
         menu = None
 
         if(isinstance(obj, AbstractFactory)): # Factory
@@ -620,8 +745,7 @@ class NodeFactoryView(object):
 
     def get_current_pkg(self):
         """ Return the current package """
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
         # obj is necessary a pseudo package (menu disbled in other case)
         obj = obj.item
 
@@ -798,11 +922,10 @@ class NodeFactoryView(object):
 
     def mouseDoubleClickEvent(self, event):
         # TODO: emit signal to make widget totally independent
-        if self.main_win is None:
+        if self.main_win is None or not self.session_ready():
             return
 
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
 
         if(isinstance(obj, CompositeNodeFactory)):
             session = self.main_win().session
@@ -827,8 +950,7 @@ Do you want to continue?""",
     def open_node(self):
         """ Instantiate Node : open a dialog """
 
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
 
         if self.main_win is None:
             parent = self
@@ -852,8 +974,7 @@ Do you want to continue?""",
         if self.main_win is None:
             return
 
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
 
         if(isinstance(obj, CompositeNodeFactory)):
             self.main_win().open_compositenode(obj)
@@ -868,8 +989,7 @@ Do you want to continue?""",
     def edit_properties(self):
         """ Edit Node info"""
 
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
 
         if(isinstance(obj, DataFactory)):
             QtWidgets.QMessageBox.information(self, "Properties", "Data : %s" % (obj.name))
@@ -883,8 +1003,7 @@ Do you want to continue?""",
     def remove_node(self):
         """ Remove the node from the package """
 
-        item = self.currentIndex()
-        obj = item.internalPointer()
+        obj = self.current_object()
 
         ret = QtWidgets.QMessageBox.question(self, "Remove Model",
                                             "Remove %s?\n" % (obj.name,),
@@ -32,6 +32,7 @@ from openalea.core.observer import lock_notify, AbstractListener
 from openalea.core.traitsui import View, Item, Group
 from openalea.visualea.gui_catalog import *
 from openalea.visualea.util import busy_cursor, exception_display
+from openalea.visualea.evaluation import get_evaluation_engine, is_gui_thread, post_to_gui_thread
 
 import types
 
@@ -58,7 +59,11 @@ class SignalSlotListener(AbstractListener):
         """
 
         # Don't see the point of self.qobj().emit because anyway we manage
-        # ourselves the notification with self.notify
+        # ourselves the notification with self.notify, unless the notification
+        # comes from an evaluation thread: it is then queued for the GUI thread.
+        if not is_gui_thread():
+            post_to_gui_thread(self.call_notify, sender, event)
+            return
         try:
             self.notify(sender, event)
         except:
@@ -158,10 +163,8 @@ class DefaultNodeWidget(NodeWidget, QtWidgets.QWidget):
         self.vboxlayout.addLayout(buttons)
 
 
-    @exception_display
-    @busy_cursor
     def run(self):
-        self.node.eval()
+        get_evaluation_engine().run(self.node)
 
 
     def exit(self):
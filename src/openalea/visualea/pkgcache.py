@@ -0,0 +1,395 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""On-disk cache of the metadata of the packages.
+
+Importing every ``__wralea__`` module takes a long time on large installs.
+The names, categories, tips and port counts of the factories of each
+package are saved in a JSON file, keyed by the path of its wralea file and
+validated by its modification time, size and hash. At startup, the package
+and category trees and the search are served from the cache with stand-in
+packages and factories, before the session imports the packages in another
+thread; a stand-in factory imports its real package only when it is
+resolved. The packages registered meanwhile are shown through the records
+of a :class:`PackageRecorder`.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from openalea.core.compositenode import CompositeNodeFactory
+from openalea.core.data import DataFactory
+from openalea.core.node import AbstractFactory, NodeFactory
+from openalea.core.package import Package, UserPackage
+from openalea.core.pkgmanager import PackageManager, PseudoGroup, PseudoPackage
+
+# bumped when the format of the entries changes
+CACHE_VERSION = 1
+CACHE_FILE = "visualea_packages.json"
+WRALEA_FILE = "__wralea__.py"
+
+
+def default_cache_path():
+    from openalea.core.settings import get_openalea_home_dir
+    return os.path.join(get_openalea_home_dir(), CACHE_FILE)
+
+
+def wralea_file(package):
+    """ Path of the wralea file defining package, or None """
+    path = getattr(package, "path", None)
+    if not path:
+        return None
+    if os.path.isfile(path):
+        return os.path.abspath(path)
+    path = os.path.join(path, WRALEA_FILE)
+    if os.path.isfile(path):
+        return os.path.abspath(path)
+    return None
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _ports(ports):
+    try:
+        return len(ports)
+    except TypeError:
+        return None
+
+
+def factory_kind(factory):
+    if isinstance(factory, CompositeNodeFactory):
+        return "composite"
+    elif isinstance(factory, DataFactory):
+        return "data"
+    elif isinstance(factory, NodeFactory):
+        return "node"
+    return None
+
+
+def factory_record(factory):
+    """ Metadata of factory, or None if it can not be cached """
+    kind = factory_kind(factory)
+    if kind is None:
+        return None
+    try:
+        tip = factory.get_tip()
+    except Exception:
+        tip = getattr(factory, "description", "")
+    return {"name": factory.name,
+            "kind": kind,
+            "category": getattr(factory, "category", "") or "",
+            "description": getattr(factory, "description", "") or "",
+            "tip": str(tip or ""),
+            "inputs": _ports(getattr(factory, "inputs", None)),
+            "outputs": _ports(getattr(factory, "outputs", None))}
+
+
+def package_record(package):
+    metainfo = dict((str(k), str(v)) for k, v in (getattr(package, "metainfo", None) or {}).items())
+    factories = []
+    for name, factory in list(package.items()):
+        if name.startswith("#"):
+            continue
+        record = factory_record(factory)
+        if record is not None:
+            factories.append(record)
+    return {"name": package.name, "path": package.path, "metainfo": metainfo,
+            "factories": factories}
+
+
+class PackageCache(object):
+    """ Metadata of the packages, by wralea file """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}   # wralea file -> entry
+        self.modified = False
+
+    def load(self):
+        """ Read the cache file; a missing, corrupted or outdated file is
+        ignored. """
+        self.entries = {}
+        self.modified = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return False
+        self.entries = data.get("wraleas", {})
+        return True
+
+    def save(self):
+        """ Write the cache file if it was modified, atomically """
+        if not self.modified:
+            return
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".pkgcache", dir=dirname)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": CACHE_VERSION, "wraleas": self.entries}, f)
+            os.replace(tmp, self.path)
+        except (IOError, OSError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.modified = False
+
+    def lookup(self, wralea):
+        """ Packages recorded for the wralea file, or None if the file
+        changed since they were recorded. """
+        entry = self.entries.get(wralea)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(wralea)
+        except OSError:
+            return None
+        if entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            # touched: compare the contents
+            if entry["size"] != stat.st_size or entry["hash"] != file_hash(wralea):
+                return None
+            entry["mtime"] = stat.st_mtime
+            self.modified = True
+        return entry["packages"]
+
+    def valid_entries(self):
+        """ Yield the packages recorded for the unchanged wralea files and
+        forget the others """
+        for wralea in list(self.entries):
+            packages = self.lookup(wralea)
+            if packages is None:
+                del self.entries[wralea]
+                self.modified = True
+                continue
+            for record in packages:
+                yield wralea, record
+
+    def update(self, pkgmanager):
+        """ Record the packages of pkgmanager whose wralea file is not
+        already recorded as is. User packages are edited at runtime and are
+        not recorded. Return the number of wralea files recorded. """
+        packages = {}
+        seen = set()
+        for pkg in list(pkgmanager.values()):
+            if id(pkg) in seen or isinstance(pkg, (UserPackage, CachedPackage)):
+                continue
+            seen.add(id(pkg))
+            wralea = wralea_file(pkg)
+            if wralea is not None:
+                packages.setdefault(wralea, []).append(pkg)
+
+        for wralea in [w for w in self.entries if w not in packages]:
+            del self.entries[wralea]
+            self.modified = True
+        changes = 0
+        for wralea, pkgs in packages.items():
+            names = sorted(p.name for p in pkgs)
+            known = self.lookup(wralea)
+            if known is not None and sorted(r["name"] for r in known) == names:
+                continue
+            stat = os.stat(wralea)
+            self.entries[wralea] = {"mtime": stat.st_mtime, "size": stat.st_size,
+                                    "hash": file_hash(wralea),
+                                    "packages": [package_record(p) for p in pkgs]}
+            self.modified = True
+            changes += 1
+        return changes
+
+
+##############
+# Stand-ins  #
+##############
+class CachedPackage(Package):
+    """ Package read from the cache, its wralea is not imported """
+
+    def __init__(self, record, wralea):
+        Package.__init__(self, record["name"], record["metainfo"], record["path"])
+        self.wralea = wralea
+        for fr in record["factories"]:
+            factory = CachedFactory(self, fr)
+            dict.__setitem__(self, factory.name, factory)
+
+
+# the factory classes the cached factories stand for
+_factory_types = {"node": NodeFactory,
+                  "composite": CompositeNodeFactory,
+                  "data": DataFactory}
+
+
+class CachedFactory(object):
+    """ Factory read from the cache.
+
+    It is not a core factory: it only provides what the package trees, the
+    search and drag and drop use. factory_type is the class of the factory
+    it stands for. The real factory is looked up, and its package loaded if
+    needed, when it is instantiated.
+    """
+
+    def __init__(self, package, record):
+        self.factory_type = _factory_types[record["kind"]]
+        self.mimetype = self.factory_type.mimetype
+        self.package = package
+        self.name = record["name"]
+        self.category = record["category"]
+        self.description = record["description"]
+        self.tip = record["tip"]
+        self.inputs = None if record["inputs"] is None else [{}] * record["inputs"]
+        self.outputs = None if record["outputs"] is None else [{}] * record["outputs"]
+
+    def get_id(self):
+        return self.name
+
+    def get_tip(self):
+        return self.tip
+
+    def resolve(self):
+        """ The real factory, importing its package if needed """
+        pkgmanager = PackageManager()
+        pkgId = self.package.name
+        if pkgId not in pkgmanager:
+            pkgmanager.load_directory(os.path.dirname(self.package.wralea))
+        return pkgmanager[pkgId][self.name]
+
+    def instantiate(self, *args, **kwargs):
+        return self.resolve().instantiate(*args, **kwargs)
+
+    def instantiate_widget(self, *args, **kwargs):
+        return self.resolve().instantiate_widget(*args, **kwargs)
+
+
+def factory_type(item):
+    """ The class of item, or of the factory item stands for """
+    if isinstance(item, CachedFactory):
+        return item.factory_type
+    return type(item)
+
+
+def is_factory(item):
+    return isinstance(item, (AbstractFactory, CachedFactory))
+
+
+class CachedPackageManager(dict):
+    """ Package name -> CachedPackage, with the pseudo trees of the package
+    manager """
+
+    def __init__(self, cache=None):
+        dict.__init__(self)
+        if cache is None:
+            return
+        for wralea, record in cache.valid_entries():
+            try:
+                self[record["name"]] = CachedPackage(record, wralea)
+            except (KeyError, TypeError):
+                continue
+
+    def packages(self):
+        """ Each package once, aliases excluded """
+        seen = set()
+        for name, pkg in list(self.items()):
+            if name.startswith("#") or id(pkg) in seen:
+                continue
+            seen.add(id(pkg))
+            yield name, pkg
+
+    def get_pseudo_pkg(self):
+        root = PseudoPackage("Root")
+        for name, pkg in self.packages():
+            root.add_name(name, pkg)
+        return root
+
+    def get_pseudo_cat(self):
+        root = PseudoGroup("Root")
+        for name, pkg in self.packages():
+            for fname, factory in list(pkg.items()):
+                if fname.startswith("#"):
+                    continue
+                for category in (getattr(factory, "category", "") or "").split(","):
+                    if category.strip():
+                        root.add_name(category.strip(), factory)
+        return root
+
+
+class LoadingPackageManager(CachedPackageManager):
+    """ The packages loaded so far (package name -> package), completed by
+    the cached packages that are not loaded yet """
+
+    def __init__(self, cached, loaded):
+        CachedPackageManager.__init__(self)
+        self.update(cached)
+        self.update(loaded)
+        self.loaded = len(set(id(pkg) for pkg in loaded.values()))
+        # the packages recorded in the cache, 0 if nothing is recorded
+        pending = set(id(pkg) for name, pkg in cached.items() if name not in loaded)
+        self.expected = self.loaded + len(pending) if cached else 0
+
+    def signature(self):
+        """ Changes when packages are added or replaced """
+        return frozenset((name, id(pkg)) for name, pkg in self.items())
+
+
+class PackageRecorder(object):
+    """ Records the packages registered in pkgmanager while the session
+    fills it in another thread.
+
+    The package manager is not thread-safe and is not read by the GUI thread
+    while it is filled. Instead add_package is wrapped: each package is
+    recorded as a package record, in the registering thread and under a
+    lock, and take() turns the records into stand-in packages.
+    """
+
+    def __init__(self, pkgmanager):
+        self.pkgmanager = pkgmanager
+        self.__lock = threading.Lock()
+        self.__records = []
+        self.__add_package = pkgmanager.add_package
+        pkgmanager.add_package = self.add_package
+
+    def add_package(self, package, *args, **kwargs):
+        ret = self.__add_package(package, *args, **kwargs)
+        record = package_record(package), wralea_file(package)
+        with self.__lock:
+            self.__records.append(record)
+        return ret
+
+    def take(self):
+        """ Return the CachedPackages of the packages registered since the
+        last call """
+        with self.__lock:
+            records, self.__records = self.__records, []
+        return [CachedPackage(record, wralea) for record, wralea in records]
+
+    def stop(self):
+        """ Stop recording, once the package manager is filled """
+        vars(self.pkgmanager).pop("add_package", None)
+
+
+def load_cached_manager(path=None):
+    """ Return (cache, manager) where manager serves the packages recorded
+    in the cache file at path (by default in the openalea home directory). """
+    cache = PackageCache(path or default_cache_path())
+    cache.load()
+    return cache, CachedPackageManager(cache)
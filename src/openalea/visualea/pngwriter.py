@@ -0,0 +1,133 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Streaming PNG writer.
+
+The image is given band by band, from top to bottom, and each band is
+compressed and written as soon as possible, so that the whole image never
+needs to be in memory. Bands can be compressed by a pool of threads (zlib
+releases the GIL): each band is an independent raw deflate block ending on a
+byte boundary, and the blocks are concatenated in order into a single zlib
+stream. This module does not depend on Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# bytes per pixel of the RGB8 images written
+CHANNELS = 3
+
+
+def _chunk(kind, data):
+    return (struct.pack(">I", len(data)) + kind + data +
+            struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+
+def _deflate(data, level, last):
+    """ Raw deflate block of data, ending on a byte boundary """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last
+                                                         else zlib.Z_SYNC_FLUSH)
+
+
+class PngWriter(object):
+    """ Writes an RGB image of width x height pixels to a binary file """
+
+    def __init__(self, fileobj, width, height, dpi=None, level=6, workers=0):
+        """
+        :param dpi: resolution stored in the file, if not None.
+        :param workers: number of compression threads, 0 to compress in the
+                        calling thread.
+        """
+        self.file = fileobj
+        self.width, self.height = int(width), int(height)
+        if self.width < 1 or self.height < 1:
+            raise ValueError("empty image")
+        self.level = level
+        self.__rows = 0
+        self.__adler = 1
+        self.__pool = ThreadPoolExecutor(workers) if workers > 0 else None
+        self.__pending = deque()
+        self.__maxPending = max(1, workers)
+
+        self.file.write(PNG_SIGNATURE)
+        # 8 bits per channel, RGB, deflate, no filter method, no interlace
+        self.file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height,
+                                                   8, 2, 0, 0, 0)))
+        if dpi:
+            ppm = int(round(dpi / 0.0254))
+            self.file.write(_chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1)))
+        # zlib header: deflate, 32k window, default compression
+        self.__write_data(b"\x78\x9c")
+
+    def __write_data(self, data):
+        if data:
+            self.file.write(_chunk(b"IDAT", data))
+
+    def __flush_pending(self, keep):
+        while len(self.__pending) > keep:
+            self.__write_data(self.__pending.popleft().result())
+
+    def write_band(self, rows):
+        """ Append rows of the image, each of width * 3 bytes """
+        rowSize = self.width * CHANNELS
+        # each row starts with its filter type (0: none)
+        data = b"".join(b"\x00" + bytes(row[:rowSize]) for row in rows)
+        count = len(data) // (rowSize + 1)
+        if self.__rows + count > self.height:
+            raise ValueError("more rows than the height of the image")
+        self.__rows += count
+        self.__adler = zlib.adler32(data, self.__adler)
+        last = self.__rows == self.height
+        if self.__pool is None:
+            self.__write_data(_deflate(data, self.level, last))
+            return
+        self.__pending.append(self.__pool.submit(_deflate, data, self.level, last))
+        # bound the memory used by the bands being compressed
+        self.__flush_pending(self.__maxPending)
+
+    def close(self):
+        if self.__rows != self.height:
+            raise ValueError("%d rows written out of %d" % (self.__rows, self.height))
+        self.__flush_pending(0)
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+        self.__write_data(struct.pack(">I", self.__adler & 0xffffffff))
+        self.file.write(_chunk(b"IEND", b""))
+
+    def abort(self):
+        """ Stop the compression threads, the image is left incomplete """
+        # shutdown(cancel_futures=True) needs python 3.9
+        for future in self.__pending:
+            future.cancel()
+        self.__pending.clear()
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, traceback):
+        if excType is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,267 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Memoization of node results.
+
+When the cache is enabled on a function node, its function is wrapped in a
+:class:`CachedFunction` that looks up the results in a process wide LRU
+:class:`ResultCache`, keyed by the factory of the node and a fingerprint of
+its inputs. Results are shared by all the instances of a factory, so they
+survive a workspace being closed and reopened.
+
+Cached results are returned as is, nodes must not modify their inputs.
+This module does not depend on Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import hashlib
+import pickle
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+
+CACHE_KEY = "cacheResults"
+
+
+class Uncacheable(Exception):
+    """ The inputs of a node can not be fingerprinted """
+    pass
+
+
+###############
+# Fingerprint #
+###############
+def _feed(h, value):
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        # -- fast path: hash the buffer instead of pickling --
+        if value.dtype.hasobject:
+            raise Uncacheable("object array")
+        h.update(b"nd" + value.dtype.str.encode() + repr(value.shape).encode())
+        h.update(memoryview(numpy.ascontiguousarray(value)).cast("B"))
+    elif value is None or isinstance(value, (bool, int, float, complex)):
+        h.update(b"s" + type(value).__name__.encode() + repr(value).encode())
+    elif isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        h.update(b"u" + struct.pack("<Q", len(data)) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        h.update(b"b" + struct.pack("<Q", len(value)) + bytes(value))
+    elif isinstance(value, (list, tuple)):
+        h.update(b"l" if isinstance(value, list) else b"t")
+        h.update(struct.pack("<Q", len(value)))
+        for v in value:
+            _feed(h, v)
+    elif isinstance(value, dict):
+        items = sorted((fingerprint(k), v) for k, v in value.items())
+        h.update(b"d" + struct.pack("<Q", len(items)))
+        for k, v in items:
+            h.update(k)
+            _feed(h, v)
+    else:
+        try:
+            data = pickle.dumps(value, protocol=4)
+        except Exception:
+            raise Uncacheable(type(value).__name__)
+        h.update(b"p" + struct.pack("<Q", len(data)) + data)
+
+
+def fingerprint(value):
+    """ Return a stable digest of value (bytes) or raise Uncacheable """
+    h = hashlib.blake2b(digest_size=20)
+    _feed(h, value)
+    return h.digest()
+
+
+# containers with more items are estimated from their first items
+SIZEOF_SAMPLE = 64
+SIZEOF_DEPTH = 4
+
+
+def sizeof(value, _depth=0):
+    """ Cheap estimate of the memory used by value, in bytes. Arrays count
+    their buffer; large containers are extrapolated from their first items
+    and nesting is followed a few levels only. """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.nbytes
+    try:
+        size = sys.getsizeof(value)
+    except TypeError:
+        size = 64
+    if _depth >= SIZEOF_DEPTH or isinstance(value, (str, bytes, bytearray)):
+        return size
+    if isinstance(value, dict):
+        items = list(islice(value.items(), SIZEOF_SAMPLE))
+        sample = sum(sizeof(k, _depth + 1) + sizeof(v, _depth + 1) for k, v in items)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(islice(value, SIZEOF_SAMPLE))
+        sample = sum(sizeof(v, _depth + 1) for v in items)
+    else:
+        attributes = getattr(value, "__dict__", None)
+        if isinstance(attributes, dict):
+            size += sizeof(attributes, _depth + 1)
+        return size
+    if items:
+        size += sample * len(value) // len(items)
+    return size
+
+
+###############
+# LRU storage #
+###############
+class ResultCache(object):
+    """ LRU map of results bounded by their total size in bytes """
+
+    def __init__(self, max_bytes=512 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, key, default=None):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        """ Store value, evicting the least recently used results. Values
+        larger than the whole budget are not stored. """
+        nbytes = sizeof(value) if nbytes is None else nbytes
+        if nbytes > self.max_bytes:
+            return False
+        with self.__lock:
+            old = self.__entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self.__entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, size) = self.__entries.popitem(last=False)
+                self.nbytes -= size
+        return True
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.nbytes = 0
+
+
+_cache = None
+
+
+def get_result_cache():
+    """ Return the cache shared by all the nodes """
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+####################
+# Node memoization #
+####################
+class CachedFunction(object):
+    """ Wraps the function of a node to memoize its results """
+
+    def __init__(self, func, key):
+        self.func = func
+        self.key = key
+        self.__doc__ = getattr(func, "__doc__", None)
+
+    def lookup_key(self, inputs):
+        """ Return the cache key of inputs, or None if they are uncacheable """
+        try:
+            return self.key, fingerprint(tuple(inputs))
+        except Uncacheable:
+            return None
+
+    def store(self, inputs, result):
+        key = self.lookup_key(inputs)
+        if key is not None:
+            get_result_cache().put(key, result)
+
+    def __call__(self, *inputs):
+        key = self.lookup_key(inputs)
+        if key is None:
+            return self.func(*inputs)
+        cache = get_result_cache()
+        result = cache.get(key, self)
+        if result is self:
+            result = self.func(*inputs)
+            cache.put(key, result)
+        return result
+
+
+def factory_key(node):
+    factory = getattr(node, "factory", None)
+    if factory is not None:
+        package = getattr(factory, "package", None)
+        return (package.name if package is not None else None, factory.name)
+    func = node.func
+    return (getattr(func, "__module__", None), getattr(func, "__qualname__", repr(func)))
+
+
+def is_cacheable(node):
+    """ Only the results of function nodes can be memoized """
+    from openalea.core.node import FuncNode
+    return (isinstance(node, FuncNode)
+            and type(node).__call__ is FuncNode.__call__
+            and node.func is not None)
+
+
+def is_cache_enabled(node):
+    try:
+        return bool(node.get_ad_hoc_dict().get_metadata(CACHE_KEY))
+    except Exception:
+        return False
+
+
+def apply_result_cache(node):
+    """ Wrap or unwrap the function of node according to its metadata """
+    if not is_cacheable(node):
+        return
+    wrapped = isinstance(node.func, CachedFunction)
+    if is_cache_enabled(node) and not wrapped:
+        node.func = CachedFunction(node.func, factory_key(node))
+    elif not is_cache_enabled(node) and wrapped:
+        node.func = node.func.func
+
+
+def set_cache_enabled(node, enabled):
+    """ Toggle the memoization of the results of node """
+    mdict = node.get_ad_hoc_dict()
+    try:
+        mdict.add_metadata(CACHE_KEY, bool)
+    except Exception:
+        # already declared
+        pass
+    mdict.set_metadata(CACHE_KEY, bool(enabled))
+    apply_result_cache(node)
@@ -0,0 +1,62 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Row insertions and removals turning one list of items into another, for
+the item models that update their views without a reset.
+
+This module does not depend on Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+
+def row_changes(rows, new):
+    """ Return the changes turning the list rows into new, items being
+    compared by identity: ("remove", first, last) changes from the end of
+    rows, then ("insert", first, items) changes in increasing order, to be
+    applied one after the other.
+
+    Return None if the items of rows that are kept are not in the same order
+    in new: the rows can not be updated by insertions and removals only.
+    """
+    oldIds = set(id(item) for item in rows)
+    newIds = set(id(item) for item in new)
+    if ([id(item) for item in rows if id(item) in newIds] !=
+            [id(item) for item in new if id(item) in oldIds]):
+        return None
+
+    changes = []
+    row = len(rows) - 1
+    while row >= 0:
+        if id(rows[row]) in newIds:
+            row -= 1
+            continue
+        last = row
+        while row >= 0 and id(rows[row]) not in newIds:
+            row -= 1
+        changes.append(("remove", row + 1, last))
+
+    # the kept rows are in the order of new: insert the others
+    row = 0
+    while row < len(new):
+        if id(new[row]) in oldIds:
+            row += 1
+            continue
+        end = row
+        while end < len(new) and id(new[end]) not in oldIds:
+            end += 1
+        changes.append(("insert", row, new[row:end]))
+        row = end
+    return changes
+
@@ -0,0 +1,257 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Inverted index of the node factories, for as-you-type search.
+
+Each factory is split into tokens (words of its name, package, category,
+tags and description). A query matches the factories that contain, for each
+of its words, the same token, a token starting with it, or failing that a
+token sharing enough trigrams with it (typos). Results are ranked by the
+fields where the words were found, the name first.
+
+This module does not depend on Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import bisect
+import heapq
+import re
+from collections import defaultdict
+
+# weight of a token found in each field
+WEIGHTS = {"name": 8., "package": 2., "category": 3., "tags": 3., "description": 1.}
+PREFIX_FACTOR = 0.6
+FUZZY_FACTOR = 0.4
+# trigram similarity (Jaccard) under which tokens are not considered close
+FUZZY_THRESHOLD = 0.4
+
+_words = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def tokenize(text):
+    """ Lower case words of text; CamelCase words are also split """
+    tokens = []
+    for word in _words.findall(text or ""):
+        lower = word.lower()
+        tokens.append(lower)
+        parts = re.findall(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])", word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts)
+    return tokens
+
+
+def trigrams(token):
+    padded = "$%s$" % token
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class SearchIndex(object):
+    """ Documents (key, payload, fields) searchable by the words of their fields """
+
+    def __init__(self):
+        self.__docs = {}                        # key -> (payload, name, tokens, words)
+        self.__postings = defaultdict(dict)     # token -> {key: weight}
+        self.__tokens = []                      # sorted tokens, for prefixes
+        self.__trigrams = defaultdict(set)      # trigram -> tokens
+        self.__gramCounts = {}                  # token -> number of trigrams
+
+    def __len__(self):
+        return len(self.__docs)
+
+    def __contains__(self, key):
+        return key in self.__docs
+
+    def keys(self):
+        return self.__docs.keys()
+
+    def payload(self, key):
+        return self.__docs[key][0]
+
+    def add(self, key, payload, fields):
+        """ Index payload under key, replacing the previous document of key.
+
+        :param fields: dict of field name (see WEIGHTS) -> text.
+        """
+        if key in self.__docs:
+            self.remove(key)
+        weights = {}
+        for field, text in fields.items():
+            weight = WEIGHTS.get(field, 1.)
+            for token in tokenize(text):
+                if weights.get(token, 0.) < weight:
+                    weights[token] = weight
+        for token, weight in weights.items():
+            postings = self.__postings[token]
+            if not postings:
+                bisect.insort(self.__tokens, token)
+                grams = trigrams(token)
+                self.__gramCounts[token] = len(grams)
+                for gram in grams:
+                    self.__trigrams[gram].add(token)
+            postings[key] = weight
+        name = (fields.get("name") or "").lower()
+        self.__docs[key] = (payload, name, list(weights), " ".join(_words.findall(name)))
+
+    def remove(self, key):
+        doc = self.__docs.pop(key, None)
+        if doc is None:
+            return
+        for token in doc[2]:
+            postings = self.__postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self.__postings[token]
+                del self.__tokens[bisect.bisect_left(self.__tokens, token)]
+                del self.__gramCounts[token]
+                for gram in trigrams(token):
+                    grams = self.__trigrams[gram]
+                    grams.discard(token)
+                    if not grams:
+                        del self.__trigrams[gram]
+
+    def __matches(self, word):
+        """ key -> score of the documents matching word """
+        scores = {}
+
+        def collect(token, factor):
+            for key, weight in self.__postings[token].items():
+                score = weight * factor
+                if scores.get(key, 0.) < score:
+                    scores[key] = score
+
+        tokens = self.__tokens
+        start = bisect.bisect_left(tokens, word)
+        end = bisect.bisect_left(tokens, word + "\uffff")
+        for token in tokens[start:end]:
+            collect(token, 1. if token == word else PREFIX_FACTOR)
+        if scores or len(word) < 3:
+            return scores
+
+        # -- no token starts with word: look for close tokens --
+        grams = trigrams(word)
+        shared = defaultdict(int)
+        for gram in grams:
+            for token in self.__trigrams.get(gram, ()):
+                shared[token] += 1
+        for token, count in shared.items():
+            similarity = float(count) / (len(grams) + self.__gramCounts[token] - count)
+            if similarity >= FUZZY_THRESHOLD:
+                collect(token, FUZZY_FACTOR * similarity)
+        return scores
+
+    def search(self, query, limit=None, accept=None):
+        """ Return the payloads of the documents matching all the words of
+        query, best first. An empty query returns all the documents, sorted
+        by name.
+
+        :param accept: if given, only the payloads for which accept(payload)
+                       is True are returned.
+        """
+        docs = self.__docs
+        words = tokenize(query)
+        if not words:
+            keys = (k for k in docs if accept is None or accept(docs[k][0]))
+            ranked = sorted(keys, key=lambda k: docs[k][1])
+            return [docs[k][0] for k in ranked[:limit]]
+
+        total = None
+        for word in words:
+            scores = self.__matches(word)
+            if total is None:
+                total = scores
+            else:
+                total = dict((k, s + scores[k]) for k, s in total.items() if k in scores)
+            if not total:
+                return []
+        # the name is the query itself
+        whole = " ".join(_words.findall(query.lower()))
+        candidates = ((score + (WEIGHTS["name"] if docs[k][3] == whole else 0.), k)
+                      for k, score in total.items()
+                      if accept is None or accept(docs[k][0]))
+        order = lambda item: (-item[0], docs[item[1]][1])
+        if limit is None:
+            ranked = sorted(candidates, key=order)
+        else:
+            ranked = heapq.nsmallest(limit, candidates, key=order)
+        return [docs[k][0] for score, k in ranked]
+
+
+##################
+# Node factories #
+##################
+def factory_key(factory):
+    return factory.package.get_id(), factory.name
+
+
+def factory_fields(factory):
+    tags = getattr(factory, "tags", None) or ()
+    if not isinstance(tags, str):
+        tags = " ".join(str(t) for t in tags)
+    return {"name": factory.name,
+            "package": factory.package.get_id(),
+            "category": getattr(factory, "category", "") or "",
+            "tags": tags,
+            "description": getattr(factory, "description", "") or ""}
+
+
+def iter_factories(pkgmanager):
+    """ Yield each public factory of the packages of pkgmanager once """
+    seen = set()
+    for pkg in list(pkgmanager.values()):
+        if id(pkg) in seen:
+            continue
+        seen.add(id(pkg))
+        for name, factory in list(pkg.items()):
+            if name.startswith("#") or id(factory) in seen:
+                continue
+            seen.add(id(factory))
+            yield factory
+
+
+def build_factory_index(pkgmanager):
+    index = SearchIndex()
+    for factory in iter_factories(pkgmanager):
+        index.add(factory_key(factory), factory, factory_fields(factory))
+    return index
+
+
+def factory_changes(index, pkgmanager):
+    """ Return (removed keys, [(key, factory)] added or replaced) between
+    index and the factories of pkgmanager. Only reads index, so that it can
+    run in a worker thread while the index is searched. """
+    current = {}
+    for factory in iter_factories(pkgmanager):
+        current[factory_key(factory)] = factory
+    removed = [k for k in list(index.keys()) if k not in current]
+    changed = [(key, factory) for key, factory in current.items()
+               if key not in index or index.payload(key) is not factory]
+    return removed, changed
+
+
+def apply_factory_changes(index, changes):
+    """ Apply the changes returned by factory_changes. Return the number of
+    documents changed. """
+    removed, changed = changes
+    for key in removed:
+        index.remove(key)
+    for key, factory in changed:
+        index.add(key, factory, factory_fields(factory))
+    return len(removed) + len(changed)
+
+
+def update_factory_index(index, pkgmanager):
+    """ Add the new factories of pkgmanager to index and remove those that
+    are gone. Return the number of documents changed. """
+    return apply_factory_changes(index, factory_changes(index, pkgmanager))
@@ -0,0 +1,95 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the CeCILL v2 License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL_V2-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+################################################################################
+"""Cached snapshot of the Visualea settings.
+
+Settings are stored as python literals in the OpenAlea configuration file.
+They used to be read and ``eval``'ed on every use, including in the
+notification path of every vertex. :func:`get_ui_settings` parses them once;
+:func:`invalidate_ui_settings` must be called after new values are written.
+"""
+
+from builtins import object
+__license__ = "CeCILL v2"
+__revision__ = " $Id$ "
+
+from ast import literal_eval
+
+from openalea.core.settings import NoOptionError, NoSectionError, Settings
+
+
+_MISSING = object()
+
+
+def _read(config, section, option, default=_MISSING, literal=True, convert=None):
+    """ Return the (literal) value of section/option converted by convert,
+    or default if it is absent, cannot be parsed or has the wrong type """
+    try:
+        value = config.get(section, option)
+        if literal:
+            value = literal_eval(value)
+        return value if convert is None else convert(value)
+    except (NoSectionError, NoOptionError, ValueError, SyntaxError, TypeError):
+        return None if default is _MISSING else default
+
+
+class UISettings(object):
+    """ Typed values of the settings used by Visualea.
+
+    Window geometry entries are None when the user never saved them.
+    """
+
+    def __init__(self, config=None):
+        config = config or Settings()
+
+        # UI
+        self.eval_cue = _read(config, "UI", "EvalCue", True, convert=bool)
+        self.double_click = _read(config, "UI", "DoubleClick", ["open"], convert=list)
+        self.edge_style = _read(config, "UI", "EdgeStyle", "Spline", literal=False)
+        self.continuous_eval_delay = _read(config, "UI", "ContinuousEvalDelay", 300, convert=int)
+
+        # editor
+        self.use_external_editor = _read(config, "editor", "use_external", False, convert=bool)
+        self.editor_command = _read(config, "editor", "command", "", literal=False)
+
+        # package manager
+        self.search_path = _read(config, "pkgmanager", "path", [], convert=list)
+
+        # main window
+        self.main_window_size = _read(config, "MainWindow", "size")
+        self.main_window_pos = _read(config, "MainWindow", "pos")
+        self.splitter_2 = _read(config, "MainWindow", "splitter_2")
+        self.splitter_3 = _read(config, "MainWindow", "splitter_3")
+
+        # workspace
+        self.last_open = _read(config, "WorkSpace", "last", [], convert=list)
+
+        # provenance
+        self.provenance = _read(config, "Provenance", "enable")
+
+
+_snapshot = None
+
+
+def get_ui_settings():
+    """ Return the cached settings snapshot, reading the settings if needed """
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = UISettings()
+    return _snapshot
+
+
+def invalidate_ui_settings():
+    """ Drop the snapshot. To be called each time settings are written """
+    global _snapshot
+    _snapshot = None
@@ -0,0 +1,99 @@
+# -*- python -*-
+#
+#       OpenAlea.Visualea: OpenAlea graphical user interface
+#
+#       Copyright 2006-2023 INRIA - CIRAD - INRAE
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.rtfd.io
+#
+###############################################################################
+"""Short descriptions of port values, for tooltips.
+
+The values flowing in a dataflow can be huge (arrays, MTGs...): they are
+described by their type, shape, dtype or length and a preview of their first
+elements, without ever building their full repr. This module does not depend
+on Qt.
+"""
+
+__license__ = "Cecill-C"
+__revision__ = " $Id$ "
+
+import itertools
+import sys
+
+# items shown in the preview of a container
+HEAD_ITEMS = 6
+# characters shown of a string, and of the whole summary
+HEAD_CHARS = 80
+MAX_LENGTH = 400
+
+
+def _clip(text, length):
+    if len(text) > length:
+        return text[:length] + "..."
+    return text
+
+
+def _preview(value, depth):
+    """ Bounded repr of value, used for the elements of containers """
+    if value is None or isinstance(value, (bool, float, complex)):
+        return repr(value)
+    if isinstance(value, int):
+        # the repr of a huge int is costly too
+        if value.bit_length() > 128:
+            return "<int of %d bits>" % value.bit_length()
+        return repr(value)
+    if isinstance(value, (str, bytes)):
+        return repr(value[:HEAD_CHARS]) + ("..." if len(value) > HEAD_CHARS else "")
+    if depth > 0 and isinstance(value, (list, tuple, set, frozenset, dict)):
+        return _container(value, depth - 1)
+    return _describe(value)
+
+
+def _container(value, depth):
+    if isinstance(value, dict):
+        head = ("%s: %s" % (_preview(k, depth), _preview(v, depth))
+                for k, v in itertools.islice(value.items(), HEAD_ITEMS))
+        opening, closing = "{", "}"
+    else:
+        head = (_preview(v, depth) for v in itertools.islice(value, HEAD_ITEMS))
+        opening, closing = {list: "[]", tuple: "()"}.get(type(value), "{}")
+    more = ", ..." if len(value) > HEAD_ITEMS else ""
+    return opening + ", ".join(head) + more + closing
+
+
+def _describe(value):
+    """ Type name, and length or shape when the value has one """
+    text = type(value).__name__
+    shape = getattr(value, "shape", None)
+    if isinstance(shape, tuple):
+        text += " shape=%s" % (shape,)
+    else:
+        try:
+            text += " len=%d" % len(value)
+        except Exception:
+            pass
+    return "<%s>" % text
+
+
+def summarize(value, maxLength=MAX_LENGTH):
+    """ Return a one or two line description of value, at most maxLength
+    characters long """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        head = [_preview(v.item() if isinstance(v, numpy.generic) else v, 0)
+                for v in itertools.islice(value.flat, HEAD_ITEMS)]
+        more = ", ..." if value.size > HEAD_ITEMS else ""
+        text = "ndarray shape=%s dtype=%s\n[%s%s]" % (value.shape, value.dtype,
+                                                     ", ".join(head), more)
+    elif isinstance(value, (str, bytes)):
+        text = "%s len=%d\n%s" % (type(value).__name__, len(value), _preview(value, 0))
+    elif isinstance(value, (list, tuple, set, frozenset, dict)):
+        text = "%s len=%d\n%s" % (type(value).__name__, len(value), _container(value, 1))
+    else:
+        text = _preview(value, 1)
+    return _clip(text, maxLength)
@@ -31,8 +31,10 @@ from qtpy.QtCore import __version__
 from openalea.core import logger
 from openalea.visualea.mainwindow import MainWindow
 from openalea.core.session import Session
+from openalea.core.pkgmanager import PackageManager
 
-MULTITHREAD = False
+# start the session in a worker thread, the main window being usable meanwhile
+MULTITHREAD = True
 
 # from Qt 5.5 uncaught exception from C++ calls qFatal() that calls abort()
 # here we try to catch all uncaught exception
@@ -65,22 +67,28 @@ class Openalea(QtWidgets.QApplication):
         self.splash = show_splash_screen()
         # -- main window --
         self.win = MainWindow(None)
-        self.win.setEnabled(False)
         self.win.show()
         self.win.raise_()
         self.sessionStarted.connect(self.win.on_session_started)
         # -- start session in a thread --
         if MULTITHREAD:
-            self.sessionth = threadit(timeit, self, self.__cb_session_thread_end, Session)
+            # the status bar of the window shows the progress instead
+            self.splash.finish(self.win)
+            # the package manager is a singleton created without a lock:
+            # create it before the thread that fills it
+            self.win.start_loading(PackageManager())
+            self.sessionth = threadit(timeit, self, self.__cb_session_thread_end,
+                                      create_session, self.win.pkgcache)
+            # the loading of the packages can not be interrupted
+            self.aboutToQuit.connect(self.sessionth.wait)
         else:
-            session = Session()
+            self.win.setEnabled(False)
+            session = create_session(self.win.pkgcache)
             self.splash.finish(self.win)
             self.win.setEnabled(True)
             self.sessionStarted.emit(session)
 
     def __cb_session_thread_end(self):
-        self.splash.finish(self.win)
-        self.win.setEnabled(True)
         self.sessionStarted.emit(self.sessionth.retVal)
 
     @staticmethod
@@ -135,6 +143,18 @@ def show_splash_screen():
     QtWidgets.QApplication.processEvents()
     return splash
 
+def create_session(pkgcache):
+    """Create the session, then record its packages in pkgcache. Runs in the
+    session thread when MULTITHREAD is set, the cache being hashed and
+    written there rather than in the GUI thread."""
+    session = Session()
+    try:
+        pkgcache.update(session.pkgmanager)
+        pkgcache.save()
+    except (IOError, OSError) as e:
+        logger.warning("Unable to write the package cache: %s" % e)
+    return session
+
 def timeit(f, *args, **kwargs):
     t1 = time.time()
     ret = f(*args, **kwargs)
@@ -0,0 +1,31 @@
+"""
+Benchmark of the layered layout of large dataflows.
+
+Random graphs whose edges mostly go forward, as in imported workflows, and a
+long chain (the worst case for the number of layers).
+
+Run with ``python test/benchmark/bench_autolayout.py [nb_vertices]``.
+"""
+import sys
+import time
+
+import numpy as np
+
+from openalea.visualea.autolayout import layered_layout
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, n, 2 * n)
+    dst = np.minimum(src + rng.integers(1, 30, 2 * n), n - 1)
+    graphs = (("random", np.stack((src, dst), axis=1)),
+              ("chain", np.stack((np.arange(n - 1), np.arange(1, n)), axis=1)))
+    for label, edges in graphs:
+        t0 = time.perf_counter()
+        layered_layout(np.full(n, 80.), np.full(n, 30.), edges)
+        print("%-8s %d vertices, %d edges: %.2f s" % (label, n, len(edges), time.perf_counter() - t0))
+
+
+if __name__ == "__main__":
+    main()
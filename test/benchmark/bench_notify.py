@@ -0,0 +1,60 @@
+"""
+Micro-benchmark of the vertex notification path.
+
+Compares reading the UI/EvalCue setting through Settings + eval (the former
+behaviour of every notification) with the cached UI settings snapshot, then
+measures the throughput of start_eval/stop_eval notifications on a vertex.
+
+Run with ``python test/benchmark/bench_notify.py``.
+"""
+import sys
+import timeit
+
+from qtpy import QtWidgets
+
+from openalea.core.node import Node
+from openalea.core.settings import Settings
+from openalea.visualea.uisettings import get_ui_settings
+
+
+N = 20000
+
+
+def read_settings_eval():
+    try:
+        return eval(Settings().get("UI", "EvalCue"))
+    except Exception:
+        return True
+
+
+def read_settings_cached():
+    return get_ui_settings().eval_cue
+
+
+def report(label, seconds, n=N):
+    print("%-32s %10.0f calls/s  (%.2f us/call)" % (label, n / seconds, 1e6 * seconds / n))
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    report("EvalCue: eval(Settings().get)", timeit.timeit(read_settings_eval, number=N))
+    report("EvalCue: get_ui_settings()", timeit.timeit(read_settings_cached, number=N))
+
+    from openalea.visualea.dataflowview.vertex import (GraphicalVertex,
+                                                       get_eval_cue_queue)
+    node = Node()
+    vertex = GraphicalVertex(node, None)
+    queue = get_eval_cue_queue()
+
+    def notify():
+        vertex.notify(node, ("start_eval",))
+        vertex.notify(node, ("stop_eval",))
+
+    report("notify start/stop_eval", timeit.timeit(notify, number=N), 2 * N)
+    report("notify + drain", timeit.timeit(lambda: (notify(), queue.drain()), number=N), 2 * N)
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of the opening of a large workspace.
+
+The "addition" dataflow of the dataflow_test package is replicated to build
+a composite node of several thousands of vertices, whose view is then
+created with and without the bulk load of the scene.
+
+Run with ``python test/benchmark/bench_open_workspace.py [copies]`` from the
+test directory, so that dataflow_test is found by the package manager.
+"""
+import contextlib
+import sys
+import time
+
+from qtpy import QtWidgets
+
+from openalea.core.compositenode import CompositeNodeFactory
+from openalea.core.pkgmanager import PackageManager
+
+
+def scaled_factory(factory, copies):
+    """ Return a factory made of copies of factory side by side """
+    elt_factory, elt_connections, elt_data, elt_ad_hoc = {}, {}, {}, {}
+    offset = max(factory.elt_factory) + 1
+    for c in range(copies):
+        shift = c * offset
+        for vid, pkg_name in factory.elt_factory.items():
+            elt_factory[vid + shift] = pkg_name
+            data = dict(factory.elt_data[vid])
+            data["id"] = vid + shift
+            data["posx"] = data.get("posx", 0.) + (c % 50) * 300.
+            data["posy"] = data.get("posy", 0.) + (c // 50) * 200.
+            elt_data[vid + shift] = data
+            if vid in factory.elt_ad_hoc:
+                elt_ad_hoc[vid + shift] = dict(factory.elt_ad_hoc[vid])
+        for i, (src, sport, dst, dport) in enumerate(factory.elt_connections.values()):
+            elt_connections[(c, i)] = (src + shift, sport, dst + shift, dport)
+    return CompositeNodeFactory(name="%s_x%d" % (factory.name, copies),
+                                elt_factory=elt_factory,
+                                elt_connections=elt_connections,
+                                elt_data=elt_data,
+                                elt_ad_hoc=elt_ad_hoc)
+
+
+@contextlib.contextmanager
+def no_bulk_load(scene):
+    yield scene
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    pm = PackageManager()
+    pm.init(verbose=False)
+    node = scaled_factory(pm["dataflow_test"]["addition"], copies).instantiate()
+
+    from openalea.visualea import dataflowview
+    bulk_load = dataflowview.bulk_load
+    print("%d vertices, %d edges" % (node.nb_vertices(), node.nb_edges()))
+    for label, loader in (("one notification per item", no_bulk_load),
+                          ("bulk load", bulk_load)):
+        dataflowview.bulk_load = loader
+        t0 = time.perf_counter()
+        view = dataflowview.GraphicalGraph.create_view(node)
+        app.processEvents()
+        print("%-28s %.2f s" % (label, time.perf_counter() - t0))
+        view.close()
+        view.deleteLater()
+        app.processEvents()
+    dataflowview.bulk_load = bulk_load
+
+
+if __name__ == "__main__":
+    main()
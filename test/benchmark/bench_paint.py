@@ -0,0 +1,89 @@
+"""
+Benchmark of the painting of a dataflow scene.
+
+Renders a scene of vertices with ports several times into an image, with
+the paint resources cache enabled then disabled, and reports the render
+time and the number of QBrush and QLinearGradient objects built per render.
+
+Run with ``python test/benchmark/bench_paint.py [nb_vertices]``.
+"""
+import sys
+import time
+
+from qtpy import QtCore, QtGui, QtWidgets
+
+from openalea.core.node import Node
+
+built = {"QBrush": 0, "QLinearGradient": 0}
+
+
+def count_constructions():
+    """ Replace QtGui.QBrush and QtGui.QLinearGradient by subclasses counting
+    their instances; the painting code looks them up on each use """
+    for name in built:
+        base = getattr(QtGui, name)
+
+        def __init__(self, *args, **kwargs):
+            built[type(self).__name__] += 1
+            type(self).__bases__[0].__init__(self, *args, **kwargs)
+        setattr(QtGui, name, type(name, (base,), {"__init__": __init__}))
+
+
+def build_scene(n):
+    from openalea.visualea.dataflowview.vertex import GraphicalVertex
+    scene = QtWidgets.QGraphicsScene()
+    columns = int(n ** 0.5) + 1
+    for i in range(n):
+        node = Node(inputs=[dict(name="in%d" % k) for k in range(3)],
+                    outputs=[dict(name="out%d" % k) for k in range(2)])
+        node.set_caption("node %d" % i)
+        vertex = GraphicalVertex(node, None)
+        scene.addItem(vertex)
+        vertex.initialise_from_model()
+        vertex.setPos((i % columns) * 120., (i // columns) * 80.)
+    return scene
+
+
+def measure(scene, image, renders):
+    """ Return (ms per render, brushes built per render, gradients built
+    per render) """
+    rect = scene.itemsBoundingRect()
+
+    def render():
+        painter = QtGui.QPainter(image)
+        scene.render(painter, QtCore.QRectF(image.rect()), rect)
+        painter.end()
+
+    render()  # warm up
+    for name in built:
+        built[name] = 0
+    t0 = time.perf_counter()
+    for _ in range(renders):
+        render()
+    elapsed = time.perf_counter() - t0
+    return (1000. * elapsed / renders, float(built["QBrush"]) / renders,
+            float(built["QLinearGradient"]) / renders)
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    renders = 10
+
+    count_constructions()
+    from openalea.visualea.dataflowview.paintcache import PaintResources
+    scene = build_scene(n)
+    image = QtGui.QImage(1600, 1200, QtGui.QImage.Format_ARGB32_Premultiplied)
+
+    print("%d vertices, %d renders" % (n, renders))
+    for enabled in (True, False):
+        PaintResources.enabled = enabled
+        ms, brushes, gradients = measure(scene, image, renders)
+        print("cache %s: %.1f ms/render, %.1f QBrush and %.1f QLinearGradient built per render"
+              % ("enabled " if enabled else "disabled", ms, brushes, gradients))
+    PaintResources.enabled = True
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
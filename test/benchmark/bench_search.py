@@ -0,0 +1,38 @@
+"""
+Benchmark of the node search index.
+
+Indexes fake factories and times as-you-type queries, from a single letter
+(the most results) to typos.
+
+Run with ``python test/benchmark/bench_search.py [nb_factories]``.
+"""
+import random
+import sys
+import time
+
+from openalea.visualea.searchindex import SearchIndex
+
+WORDS = ("image read write filter mesh plot array sum mean random graph "
+         "tree leaf root branch light water soil growth table file").split()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    index = SearchIndex()
+    t0 = time.perf_counter()
+    for i in range(n):
+        name = "".join(w.capitalize() for w in rng.sample(WORDS, 2)) + str(i % 97)
+        index.add(("pkg%d" % (i % 50), name), i,
+                  {"name": name, "package": "pkg%d" % (i % 50),
+                   "category": rng.choice(WORDS),
+                   "description": " ".join(rng.sample(WORDS, 6))})
+    print("index %d factories: %.2f s" % (n, time.perf_counter() - t0))
+    for query in ("a", "im", "ima", "image", "image rea", "imagr", "mesh plot"):
+        t0 = time.perf_counter()
+        results = index.search(query, 200)
+        print("%-10s %4d results: %.2f ms" % (query, len(results), 1e3 * (time.perf_counter() - t0)))
+
+
+if __name__ == "__main__":
+    main()
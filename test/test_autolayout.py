@@ -0,0 +1,22 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from openalea.visualea.autolayout import layered_layout
+
+
+def test_layers_follow_edges():
+    xy = layered_layout([50, 50, 50, 50], [20, 20, 20, 20], [(0, 1), (1, 2), (0, 2), (2, 3)])
+    ys = xy[:, 1]
+    assert ys[0] < ys[1] < ys[2] < ys[3]
+    assert xy.min() == 0
+
+
+def test_cycle_and_no_overlap():
+    n = 30
+    edges = [(i, i + 1) for i in range(n - 1)] + [(n - 1, 0)] + [(0, i) for i in range(2, n)]
+    xy = layered_layout([40] * n, [20] * n, edges)
+    assert xy.shape == (n, 2)
+    for y in set(xy[:, 1].tolist()):
+        row = np.sort(xy[xy[:, 1] == y, 0])
+        assert (np.diff(row) >= 40).all()
@@ -0,0 +1,25 @@
+import json
+
+from openalea.visualea.batch import (parse_assignment, read_input_sets,
+                                     split_factory_name)
+
+
+def test_parse_assignment():
+    assert parse_assignment("x=3") == ("x", 3)
+    assert parse_assignment("xs=[1, 2]") == ("xs", [1, 2])
+    assert parse_assignment("name=foo") == ("name", "foo")
+
+
+def test_split_factory_name():
+    assert split_factory_name("openalea.math:+") == ("openalea.math", "+")
+
+
+def test_read_input_sets(tmp_path):
+    csvfile = tmp_path / "sets.csv"
+    csvfile.write_text("x,name\n1,a\n2.5,b\n")
+    assert read_input_sets(str(csvfile)) == [{"x": 1, "name": "a"},
+                                             {"x": 2.5, "name": "b"}]
+
+    jsonfile = tmp_path / "sets.json"
+    jsonfile.write_text(json.dumps({"x": 1}))
+    assert read_input_sets(str(jsonfile)) == [{"x": 1}]
@@ -0,0 +1,145 @@
+import threading
+from concurrent import futures
+
+import pytest
+
+pytest.importorskip("openalea.core")
+
+from openalea.visualea.evaluators import (ConcurrentEvaluation, ThreadPoolEvaluation,
+                                          set_thread_limit)
+
+
+class FakeDataflow(object):
+    """ vid -> parent vids """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def vertices(self):
+        return list(self.graph)
+
+    def nb_out_edges(self, vid):
+        return sum(vid in parents for parents in self.graph.values())
+
+    def actor(self, vid):
+        return None
+
+
+class Recording(object):
+    """ Evaluates the vertices of a FakeDataflow by recording them """
+
+    def __init__(self, graph):
+        self.order = []
+        self.lock = threading.Lock()
+        super(Recording, self).__init__(FakeDataflow(graph))
+
+    def parents(self, vid):
+        return set(self._dataflow.graph[vid])
+
+    def set_inputs(self, vid):
+        pass
+
+    def eval_vertex_code(self, vid, *args):
+        with self.lock:
+            self.order.append(vid)
+
+
+class Local(Recording, ConcurrentEvaluation):
+    """ Submits the vertices of offloaded to an executor """
+
+    def __init__(self, graph, offloaded=()):
+        Recording.__init__(self, graph)
+        self.offloaded = set(offloaded)
+        self.pool = futures.ThreadPoolExecutor(2)
+
+    def submit(self, vid, actor):
+        if vid in self.offloaded:
+            return self.pool.submit(self.eval_vertex_code, vid)
+        return None
+
+    def collect(self, vid, actor, future):
+        future.result()
+
+
+class Threaded(Recording, ThreadPoolEvaluation):
+    pass
+
+
+# 1 and 2 are independent, 3 needs both, 4 needs 3; 5 is alone
+GRAPH = {1: [], 2: [], 3: [1, 2], 4: [3], 5: []}
+
+
+def assert_dependency_order(order, graph):
+    position = dict((vid, i) for i, vid in enumerate(order))
+    for vid in order:
+        for parent in graph[vid]:
+            assert position[parent] < position[vid]
+
+
+def test_abstract():
+    with pytest.raises(TypeError):
+        ConcurrentEvaluation(FakeDataflow(GRAPH))
+
+
+@pytest.mark.parametrize("offloaded", [(), (1, 3), (1, 2, 3, 4, 5)])
+def test_dependency_order(offloaded):
+    algo = Local(GRAPH, offloaded)
+    algo.eval()
+    assert sorted(algo.order) == sorted(GRAPH)
+    assert_dependency_order(algo.order, GRAPH)
+
+
+def test_vertex_subset():
+    algo = Local(GRAPH, (2,))
+    algo.eval(3)
+    assert sorted(algo.order) == [1, 2, 3]
+    assert_dependency_order(algo.order, GRAPH)
+
+
+def test_cycle():
+    graph = {1: [3], 2: [1], 3: [2], 4: [3]}
+    algo = Local(graph, (2,))
+    algo.eval()
+    # the cycle is broken once, each vertex is evaluated once
+    assert sorted(algo.order) == [1, 2, 3, 4]
+    assert algo.order[-1] == 4
+
+
+def test_threads_overlap():
+    graph = {1: [], 2: [], 3: [1, 2]}
+    algo = Threaded(graph)
+    set_thread_limit(algo._dataflow, 2)
+    # 1 and 2 only get past the barrier if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def eval_vertex_code(vid, *args):
+        if vid in (1, 2):
+            barrier.wait()
+        Recording.eval_vertex_code(algo, vid)
+
+    algo.eval_vertex_code = eval_vertex_code
+    algo.eval()
+    assert algo.order[-1] == 3
+    assert_dependency_order(algo.order, graph)
+
+
+def test_thread_limit():
+    graph = dict((vid, []) for vid in range(8))
+    algo = Threaded(graph)
+    set_thread_limit(algo._dataflow, 2)
+    running = []
+    peak = []
+
+    def eval_vertex_code(vid, *args):
+        with algo.lock:
+            running.append(vid)
+            peak.append(len(running))
+        threading.Event().wait(0.01)
+        with algo.lock:
+            running.remove(vid)
+        Recording.eval_vertex_code(algo, vid)
+
+    algo.eval_vertex_code = eval_vertex_code
+    algo.eval()
+    assert sorted(algo.order) == list(range(8))
+    assert max(peak) <= 2
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+pytest.importorskip("openalea.core")
+
+from openalea.visualea.pkgcache import (CachedPackage, CachedPackageManager,
+                                        LoadingPackageManager, PackageCache, PackageRecorder,
+                                        package_record)
+
+
+class FakePackage(dict):
+    def __init__(self, name, path):
+        dict.__init__(self)
+        self.name = name
+        self.path = path
+        self.metainfo = {"description": "test package"}
+
+
+def make_package(tmp_path, name="pkg"):
+    wralea = tmp_path / "__wralea__.py"
+    wralea.write_text("__name__ = %r\n" % name)
+    return FakePackage(name, str(tmp_path)), str(wralea)
+
+
+def test_record_and_reload(tmp_path):
+    pkg, wralea = make_package(tmp_path)
+    cache = PackageCache(str(tmp_path / "cache.json"))
+    assert cache.update({pkg.name: pkg}) == 1
+    cache.save()
+    # already recorded as is
+    assert cache.update({pkg.name: pkg}) == 0
+
+    other = PackageCache(cache.path)
+    assert other.load()
+    records = list(other.valid_entries())
+    assert records == [(wralea, package_record(pkg))]
+
+
+def test_changed_wralea(tmp_path):
+    pkg, wralea = make_package(tmp_path)
+    cache = PackageCache(str(tmp_path / "cache.json"))
+    cache.update({pkg.name: pkg})
+
+    # same contents, new modification time: still valid
+    stat = os.stat(wralea)
+    os.utime(wralea, (stat.st_atime, stat.st_mtime + 10))
+    assert cache.lookup(wralea) is not None
+
+    with open(wralea, "a") as f:
+        f.write("# changed\n")
+    assert cache.lookup(wralea) is None
+    assert list(cache.valid_entries()) == []
+    assert cache.update({pkg.name: pkg}) == 1
+
+
+def test_corrupted_cache(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    cache = PackageCache(str(path))
+    assert not cache.load()
+    assert cache.entries == {}
+
+
+def test_loading_packages(tmp_path):
+    pkg, wralea = make_package(tmp_path)
+    cache = PackageCache(str(tmp_path / "cache.json"))
+    cache.update({pkg.name: pkg})
+    cached = CachedPackageManager(cache)
+    assert isinstance(cached["pkg"], CachedPackage)
+
+    loading = LoadingPackageManager(cached, {})
+    assert (loading.loaded, loading.expected) == (0, 1)
+    assert isinstance(loading["pkg"], CachedPackage)
+
+    other = FakePackage("other", str(tmp_path))
+    loading = LoadingPackageManager(cached, {"pkg": pkg, "other": other})
+    assert (loading.loaded, loading.expected) == (2, 2)
+    assert loading["pkg"] is pkg
+
+
+class FakeManager(dict):
+    def add_package(self, package):
+        self[package.name] = package
+
+
+def test_recorder(tmp_path):
+    manager = FakeManager()
+    recorder = PackageRecorder(manager)
+    pkg, wralea = make_package(tmp_path)
+    manager.add_package(pkg)
+    assert manager["pkg"] is pkg
+
+    taken = recorder.take()
+    assert [p.name for p in taken] == ["pkg"]
+    assert isinstance(taken[0], CachedPackage) and taken[0].wralea == wralea
+    assert recorder.take() == []
+
+    recorder.stop()
+    manager.add_package(FakePackage("other", str(tmp_path)))
+    assert recorder.take() == []
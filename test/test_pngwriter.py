@@ -0,0 +1,47 @@
+import io
+import struct
+import zlib
+
+from openalea.visualea.pngwriter import PNG_SIGNATURE, PngWriter
+
+
+def read_png(data):
+    assert data.startswith(PNG_SIGNATURE)
+    pos, chunks = len(PNG_SIGNATURE), []
+    while pos < len(data):
+        size, = struct.unpack(">I", data[pos:pos + 4])
+        kind, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + size]
+        crc, = struct.unpack(">I", data[pos + 8 + size:pos + 12 + size])
+        assert crc == zlib.crc32(kind + body) & 0xffffffff
+        chunks.append((kind, body))
+        pos += 12 + size
+    width, height = struct.unpack(">II", chunks[0][1][:8])
+    pixels = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    return width, height, pixels, [kind for kind, body in chunks]
+
+
+def test_bands_make_one_image():
+    width, height = 5, 7
+    rows = [bytes((x * 10 + y) % 256 for x in range(width * 3)) for y in range(height)]
+    for workers in (0, 3):
+        out = io.BytesIO()
+        writer = PngWriter(out, width, height, dpi=300, workers=workers)
+        for start in range(0, height, 2):
+            writer.write_band(rows[start:start + 2])
+        writer.close()
+        w, h, pixels, kinds = read_png(out.getvalue())
+        assert (w, h) == (width, height)
+        assert kinds[:2] == [b"IHDR", b"pHYs"] and kinds[-1] == b"IEND"
+        assert pixels == b"".join(b"\x00" + row for row in rows)
+
+
+def test_aborted_writer():
+    out = io.BytesIO()
+    try:
+        with PngWriter(out, 4, 4, workers=2) as writer:
+            writer.write_band([b"\x00" * 12] * 2)
+            raise RuntimeError("render failed")
+    except RuntimeError:
+        pass
+    # the image was not completed
+    assert b"IEND" not in out.getvalue()
@@ -0,0 +1,25 @@
+from openalea.visualea.dataflowview.portindex import GridIndex
+
+
+def test_nearest():
+    index = GridIndex(cellSize=32)
+    index.insert("a", 0., 0.)
+    index.insert("b", 40., 5.)
+    index.insert("c", -100., -100.)
+    assert index.nearest(35., 0., 10.) == "b"
+    assert index.nearest(5., 0., 10.) == "a"
+    assert index.nearest(20., 0., 10.) is None
+    assert index.nearest(35., 0., 50., accept=lambda k: k != "b") == "a"
+
+
+def test_move_and_remove():
+    index = GridIndex(cellSize=32)
+    index.insert("a", 0., 0.)
+    index.insert("a", 200., 200.)
+    assert len(index) == 1
+    assert index.nearest(0., 0., 10.) is None
+    assert index.nearest(198., 201., 10.) == "a"
+    index.remove("a")
+    index.remove("a")
+    assert "a" not in index
+    assert index.nearest(198., 201., 10.) is None
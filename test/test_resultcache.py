@@ -0,0 +1,42 @@
+from openalea.visualea.resultcache import (CachedFunction, ResultCache,
+                                           fingerprint, sizeof)
+
+
+def test_fingerprint():
+    assert fingerprint((1, "a", [2.5])) == fingerprint((1, "a", [2.5]))
+    assert fingerprint((1,)) != fingerprint((1.,))
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", 1, nbytes=4)
+    cache.put("b", 2, nbytes=4)
+    cache.get("a")
+    cache.put("c", 3, nbytes=4)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.nbytes == 8
+    assert not cache.put("big", 4, nbytes=11)
+
+
+def test_cached_function():
+    calls = []
+
+    def add(a, b):
+        calls.append((a, b))
+        return a + b
+
+    func = CachedFunction(add, ("test", "add"))
+    assert func(1, 2) == 3
+    assert func(1, 2) == 3
+    assert func(2, 2) == 4
+    assert calls == [(1, 2), (2, 2)]
+
+
+def test_sizeof():
+    # 8 bytes per pointer, plus the float
+    assert 100000 * 8 <= sizeof([1.5] * 100000) <= 100000 * 64
+    # not picklable
+    assert sizeof(lambda x: x) > 0
+    assert sizeof({"a": [1, 2], "b": "text"}) > sizeof("text")
@@ -0,0 +1,49 @@
+import random
+
+from openalea.visualea.rowdiff import row_changes
+
+
+def apply_changes(rows, changes):
+    """ Apply the changes to the list rows in place, the way PkgModel
+    applies them to its rows """
+    for change in changes:
+        if change[0] == "remove":
+            del rows[change[1]:change[2] + 1]
+        else:
+            rows[change[1]:change[1]] = change[2]
+    return rows
+
+
+class Item(object):
+    def __init__(self, name):
+        self.name = name
+
+
+def test_insertions_and_removals():
+    a, b, c, d, e = items = [Item(n) for n in "abcde"]
+    rows = [a, b, c, d]
+    new = [e, a, c, d]
+    changes = row_changes(rows, new)
+    assert changes == [("remove", 1, 1), ("insert", 0, [e])]
+    assert apply_changes(list(rows), changes) == new
+
+
+def test_reordered_rows():
+    a, b, c = [Item(n) for n in "abc"]
+    # b was renamed and now sorts first: rows can not be moved by the diff
+    assert row_changes([a, b, c], [b, a, c]) is None
+    assert row_changes([a, b], [b, a]) is None
+
+
+def test_random_lists():
+    rng = random.Random(0)
+    pool = [Item(i) for i in range(30)]
+    for _ in range(200):
+        rows = rng.sample(pool, rng.randint(0, 15))
+        new = rng.sample(pool, rng.randint(0, 15))
+        changes = row_changes(rows, new)
+        if changes is None:
+            kept = [i for i in rows if i in new]
+            assert kept != [i for i in new if i in rows]
+        else:
+            assert apply_changes(list(rows), changes) == new
@@ -0,0 +1,34 @@
+from openalea.visualea.searchindex import SearchIndex, tokenize
+
+
+def make_index():
+    index = SearchIndex()
+    index.add(1, "read_csv", {"name": "read_csv", "description": "Read a CSV file"})
+    index.add(2, "readImage", {"name": "readImage", "category": "image, io"})
+    index.add(3, "plot", {"name": "plot", "description": "plot data read from a file"})
+    return index
+
+
+def test_tokenize():
+    assert tokenize("readImage, CSV_file") == ["readimage", "read", "image", "csv", "file"]
+
+
+def test_ranking_and_prefix():
+    index = make_index()
+    assert index.search("read") == ["read_csv", "readImage", "plot"]
+    assert index.search("ima") == ["readImage"]
+    assert index.search("read file") == ["read_csv", "plot"]
+    assert index.search("read csv")[0] == "read_csv"
+    assert index.search("") == ["plot", "read_csv", "readImage"]
+    assert index.search("", accept=lambda p: p != "plot") == ["read_csv", "readImage"]
+
+
+def test_fuzzy_and_updates():
+    index = make_index()
+    assert index.search("imagr") == ["readImage"]
+    index.remove(2)
+    assert index.search("image") == []
+    index.add(3, "plot3d", {"name": "plot3d"})
+    assert index.search("plot") == ["plot3d"]
+    assert index.search("data") == []
+    assert len(index) == 2
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("openalea.core")
+
+from openalea.core.settings import NoOptionError
+from openalea.visualea.uisettings import UISettings
+
+
+class FakeConfig(object):
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, section, option):
+        try:
+            return self.values[section, option]
+        except KeyError:
+            raise NoOptionError(option, section)
+
+
+def test_defaults():
+    settings = UISettings(FakeConfig({}))
+    assert settings.eval_cue is True
+    assert settings.double_click == ["open"]
+    assert settings.continuous_eval_delay == 300
+    assert settings.main_window_size is None
+
+
+def test_values():
+    settings = UISettings(FakeConfig({("UI", "EvalCue"): "False",
+                                      ("UI", "ContinuousEvalDelay"): "50",
+                                      ("pkgmanager", "path"): "('a', 'b')"}))
+    assert settings.eval_cue is False
+    assert settings.continuous_eval_delay == 50
+    assert settings.search_path == ["a", "b"]
+
+
+@pytest.mark.parametrize("value", ["None", "[1]", "'abc'", "not python"])
+def test_wrong_type(value):
+    settings = UISettings(FakeConfig({("UI", "ContinuousEvalDelay"): value}))
+    assert settings.continuous_eval_delay == 300
+
+
+def test_wrong_type_list():
+    settings = UISettings(FakeConfig({("WorkSpace", "last"): "None"}))
+    assert settings.last_open == []
@@ -0,0 +1,29 @@
+from openalea.visualea.valuesummary import summarize
+
+
+class Huge(object):
+    def __len__(self):
+        return 10 ** 6
+
+    def __repr__(self):
+        raise AssertionError("the full repr must not be built")
+
+
+def test_containers_are_bounded():
+    text = summarize(list(range(10 ** 6)))
+    assert text.startswith("list len=1000000")
+    assert "0, 1, 2" in text and len(text) < 100
+    assert summarize({"a": "x" * 1000}).count("x") < 100
+
+
+def test_no_full_repr():
+    assert summarize(Huge()) == "<Huge len=1000000>"
+    assert summarize([Huge()]) == "list len=1\n[<Huge len=1000000>]"
+    assert "bits" in summarize(2 ** 100000)
+
+
+def test_numpy():
+    import pytest
+    np = pytest.importorskip("numpy")
+    text = summarize(np.arange(12.).reshape(3, 4))
+    assert text == "ndarray shape=(3, 4) dtype=float64\n[0.0, 1.0, 2.0, 3.0, 4.0, 5.0, ...]"
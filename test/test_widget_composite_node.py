@@ -1,5 +1,6 @@
 from openalea.core import logger, CompositeNodeFactory
 from openalea.visualea.mainwindow import MainWindow
+from openalea.visualea.evaluation import get_evaluation_engine
 from openalea.core.pkgmanager import PackageManager
 from qtpy import QtWidgets, QtCore
 from openalea.core.alea import *
@@ -37,6 +38,9 @@ def test_addition_composite_node():
         if ch.text() == 'Run':
             ch.click()
             break
+    # evaluation runs in a thread: wait for it and deliver its notifications
+    get_evaluation_engine().wait()
+    app.processEvents()
     # get the new caption of node 7, originally set to '0'
     output = win.children()[0].node.node(7).caption
     win.close()